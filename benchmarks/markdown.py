@@ -0,0 +1,109 @@
+"""
+Microbenchmarks of MarkdownV2 rendering against the previous replace/re.sub chain implementation.
+
+Usage:
+    python -m benchmarks.markdown --number 20000
+"""
+import argparse
+import re
+import timeit
+
+from benchmarks import stubs
+from bot.service.api import PlaneAPI
+from bot.service.mappings import MappingRegistry
+from bot.utils.markdown import escape_markdown_v2, html_to_markdownV2
+
+
+def legacy_escape_markdown_v2(text, chars=r'_*[]()~`>#+-=|{}.!'):
+    for char in chars:
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def legacy_html_to_markdown_v2(html_text):
+    replacements = [
+        (r'<b>(.*?)</b>', r'*\1*'),
+        (r'<i>(.*?)</i>', r'_\1_'),
+        (r'<u>(.*?)</u>', r'__\1__'),
+        (r'<s>(.*?)</s>', r'~\1~'),
+        (r'<code>(.*?)</code>', r'`\1`'),
+        (r'<pre>(.*?)</pre>', r'```\1```'),
+        (r'<a href="(.*?)">(.*?)</a>', r'[\2](\1)'),
+        (r'<br\s*/?>', '\n'),
+        (r'<span>(.*?)</span>', r'\1'),
+        (r'<[^>]+>', ''),
+    ]
+    for pattern, replacement in replacements:
+        html_text = re.sub(pattern, replacement, html_text, flags=re.DOTALL)
+    return legacy_escape_markdown_v2(html_text).strip()
+
+
+TASK_NAME = "Fix [crash] in sync_worker.py when state == 'Done' (see #1234) - urgent!"
+PLAIN_TASK_NAME = "Update onboarding checklist for new members"
+PLAIN_DESCRIPTION = "<p>Update the onboarding checklist with the new VPN setup steps, see the wiki page.</p>"
+DESCRIPTION = (
+    "<p>Steps to reproduce:</p><ul><li><p>Open <b>project settings</b> and press <i>Save</i></p></li>"
+    "<li><p>Check <code>worker.log</code> for <u>stack traces</u></p></li></ul>"
+    "<p>See <a href=\"https://example.com/docs/sync_(v2)\">sync docs</a> for details. "
+    "Expected: <s>crash</s> no crash.</p><pre><code>Traceback (most recent call last):\n  ...</code></pre>"
+)
+
+# Conversions checked before timing, edge cases that broke earlier versions
+HTML_CASES = [
+    ('<a>x</a> then <a href="http://x.com">link</a>', 'x then [link](http://x.com)'),
+    ('<code>a<code>b</code>c.</code> d.', '`abc.` d\\.'),
+    ('<b>bold</b> <a href="http://a.b/(c)">l_1</a>', '*bold* [l\\_1](http://a.b/(c\\))'),
+]
+
+
+def check_cases():
+    for html_text, expected in HTML_CASES:
+        result = html_to_markdownV2(html_text)
+        assert result == expected, f"{html_text!r} -> {result!r}, expected {expected!r}"
+    print(f"html_to_markdownV2: {len(HTML_CASES)} edge cases converted correctly")
+
+
+def report_tasks(issues):
+    plane = stubs.StubPlane(1, issues)
+    tasks = [plane.issue(0, k, PlaneAPI.REPORT_FIELDS) for k in range(issues)]
+    return {status: tasks[index::4] for index, status in enumerate(["Todo", "In Progress", "In Review", "Done"])}
+
+
+def bench(name, legacy, current, number):
+    legacy_time = timeit.timeit(legacy, number=number)
+    current_time = timeit.timeit(current, number=number)
+    print(
+        f"{name:<28} legacy {legacy_time / number * 1e6:10.2f}us   "
+        f"current {current_time / number * 1e6:10.2f}us   x{legacy_time / current_time:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="calls per microbenchmark")
+    parser.add_argument("--issues", type=int, default=5000, help="issues in the rendered report")
+    args = parser.parse_args()
+
+    check_cases()
+    bench("escape_markdown_v2 plain", lambda: legacy_escape_markdown_v2(PLAIN_TASK_NAME),
+          lambda: escape_markdown_v2(PLAIN_TASK_NAME), args.number)
+    bench("escape_markdown_v2 special", lambda: legacy_escape_markdown_v2(TASK_NAME),
+          lambda: escape_markdown_v2(TASK_NAME), args.number)
+    bench("html_to_markdownV2 plain", lambda: legacy_html_to_markdown_v2(PLAIN_DESCRIPTION),
+          lambda: html_to_markdownV2(PLAIN_DESCRIPTION), args.number)
+    bench("html_to_markdownV2 rich", lambda: legacy_html_to_markdown_v2(DESCRIPTION),
+          lambda: html_to_markdownV2(DESCRIPTION), args.number)
+
+    members_map = {stubs.member_id(m): f"member_{m}" for m in range(stubs.MEMBERS_COUNT)}
+    plane_api = PlaneAPI("bench-token", "bench", {}, MappingRegistry.from_maps(members_map, {}), "http://127.0.0.1/", "info")
+    categorized_tasks = report_tasks(args.issues)
+    project_details = {"name": "Bench project"}
+    report_time = timeit.timeit(
+        lambda: plane_api.generate_report_for_project(stubs.project_id(0), project_details, categorized_tasks),
+        number=10
+    )
+    print(f"{'generate_report_for_project':<28} {args.issues} issues {report_time / 10 * 1000:10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
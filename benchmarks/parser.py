@@ -0,0 +1,155 @@
+"""
+Fuzz test and benchmark of the task command parser against the previous per-field regex implementation.
+
+Usage:
+    python -m benchmarks.parser --fuzz 20000 --seed 1
+"""
+import argparse
+import random
+import re
+import string
+import timeit
+
+from bot.utils.command_parser import CommandParser, CommandSyntaxError, labels
+from bot.utils.utils import index_to_priority, normalize_date
+
+LEGACY_PATTERNS = {
+    'id': r'\s*UUID\s*:\s*(\S*)[\s,]*',
+    'title': r'Title\s*:\s*(.*?)[\s,]*(?=\s*(?:Description[\s,]*:|Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))',
+    'description': r'Description\s*:\s*(.*?)[\s,]*(?=\s*(?:Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))',
+    'start': r'Start\s*:\s*(\S*)[\s,]*',
+    'deadline': r'Deadline\s*:\s*(\S*)[\s,]*',
+    'priority': r'Priority\s*:\s*(.*?)[\s,]*',
+    'state': r'State\s*:\s*(.*?)(?=\n|$|@)[\s,]*',
+    'assignees': r'(?:^|\s)(@\w+)',
+}
+
+
+def legacy_parse(message, bot_name="bench_bot"):
+    # Compiled on every call, as the handlers did
+    re.compile(rf'^/updatetask(?:@{bot_name})?[\s,]*')
+    patterns = {
+        field: re.compile(pattern, re.DOTALL if field in ('title', 'description') else 0)
+        for field, pattern in LEGACY_PATTERNS.items()
+    }
+    parsed_data = {}
+    for field, pattern in patterns.items():
+        match = pattern.search(message)
+        if match:
+            if field == 'assignees':
+                parsed_data[field] = list(set(name.strip() for name in pattern.findall(message)))
+            else:
+                parsed_data[field] = match.group(1).strip()
+    # Conversions the handlers did after parsing
+    normalize_date(parsed_data.get('start'))
+    normalize_date(parsed_data.get('deadline'))
+    index_to_priority.get(parsed_data.get('priority'))
+    return parsed_data
+
+
+def task_message(description_size):
+    description = " ".join(random.choice(["lorem", "ipsum", "dolor", "sit", "amet,", "v1.2", "(x)"])
+                           for _ in range(description_size))
+    return (
+        "/updatetask@bench_bot\n"
+        "UUID: 00000000-0000-4000-8000-0000000004d2\n"
+        "Title: Benchmark task with a realistic title\n"
+        f"Description: {description}\n"
+        "Start: 2024-01-01\n"
+        "Deadline: 31-01-2024\n"
+        "Priority: 3\n"
+        "State: In Progress\n"
+        "@member1 @member2"
+    )
+
+
+def random_message(rng):
+    pieces = [rng.choice(["/newtask", "/updatetask@bench_bot"])]
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " \n\t,:@ёжä😀"
+    for _ in range(rng.randrange(12)):
+        kind = rng.randrange(4)
+        if kind == 0:
+            label = rng.choice(list(labels))
+            pieces.append(rng.choice([label, label.upper(), label.capitalize()]) + rng.choice([":", " :", "\t:"]))
+        elif kind == 1:
+            pieces.append("@" + "".join(rng.choice(string.ascii_lowercase + "_") for _ in range(rng.randrange(1, 8))))
+        elif kind == 2:
+            pieces.append(rng.choice(["2024-01-31", "31-01-2024", "3", "urgent",
+                                      "00000000-0000-4000-8000-0000000004d2", "Todo"]))
+        else:
+            pieces.append("".join(rng.choice(alphabet) for _ in range(rng.randrange(40))))
+    return rng.choice([" ", "\n", ", "]).join(pieces)
+
+
+def valid_message(rng):
+    words = ["fix", "sync", "v2.0", "(beta)", "crash!", "ёлка", "user_name", "a-b", "x*y"]
+    expected = {
+        "title": " ".join(rng.choice(words) for _ in range(rng.randrange(1, 8))),
+        "description": "\n".join(" ".join(rng.choice(words) for _ in range(5)) for _ in range(rng.randrange(1, 4))),
+        "start_date": f"2024-01-{rng.randrange(1, 15):02d}",
+        "target_date": f"2024-02-{rng.randrange(1, 28):02d}",
+        "priority": rng.choice(list(index_to_priority.items())),
+        "state": rng.choice(["Todo", "In Progress", "Done"]),
+        "assignees": rng.sample(["alice", "bob", "carol_1"], rng.randrange(4)),
+    }
+    message = (
+        f"/newtask, Title: {expected['title']}\nDescription: {expected['description']}\n"
+        f"Start: {expected['start_date']}\nDeadline : {expected['target_date']}\n"
+        f"Priority: {expected['priority'][0]}\nState: {expected['state']}\n"
+        + " ".join("@" + name for name in expected["assignees"])
+    )
+    expected["priority"] = expected["priority"][1]
+    return message, expected
+
+
+def fuzz(parser, iterations, seed):
+    rng = random.Random(seed)
+    for _ in range(iterations // 10):
+        message, expected = valid_message(rng)
+        fields = parser.parse_task(message, required=("title",))
+        assert {name: getattr(fields, name) for name in expected} == expected, message
+
+    parsed = failed = 0
+    for _ in range(iterations):
+        message = random_message(rng)
+        try:
+            fields = parser.parse_task(message, required=("title",))
+        except CommandSyntaxError as e:
+            assert e.errors, message
+            failed += 1
+            continue
+        # Anything accepted must be well-typed
+        assert fields.title and len(fields.title) <= 255, message
+        assert fields.priority in (None, "none", "low", "medium", "high", "urgent"), message
+        assert all(re.fullmatch(r'\w+', name) for name in fields.assignees), message
+        parsed += 1
+    print(f"fuzz: {iterations // 10} valid messages parsed exactly, {iterations} random messages: "
+          f"{parsed} parsed, {failed} rejected with errors, no crashes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fuzz", type=int, default=20000, help="random messages to parse")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--number", type=int, default=2000, help="calls per benchmark")
+    args = parser.parse_args()
+
+    command_parser = CommandParser("bench_bot")
+    fuzz(command_parser, args.fuzz, args.seed)
+
+    random.seed(args.seed)
+    for description_size in (10, 1000, 50000):
+        message = task_message(description_size)
+        number = max(1, args.number // max(1, description_size // 100))
+        legacy_time = timeit.timeit(lambda: legacy_parse(message), number=number)
+        current_time = timeit.timeit(
+            lambda: command_parser.parse_task(message, required=("task_id",)), number=number
+        )
+        print(
+            f"parse {len(message):>8} chars   legacy {legacy_time / number * 1e6:10.1f}us   "
+            f"current {current_time / number * 1e6:10.1f}us   x{legacy_time / current_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+End-to-end benchmark of PlaneNotifierBot against local stub Plane and Telegram servers.
+
+Usage:
+    python -m benchmarks.run --projects 100 --issues 5000
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import time
+
+from telegram import Update
+
+from benchmarks import stubs
+from bot.bot import PlaneNotifierBot
+from bot.service.api import PlaneAPI
+from bot.service.mappings import MappingRegistry
+from bot.utils.logger_config import logger
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def print_result(name, durations, total_time, unit="ops"):
+    print(
+        f"{name:<24} n={len(durations):<6} {len(durations) / total_time:10.1f} {unit}/s   "
+        f"p50={percentile(durations, 50) * 1000:9.1f}ms  "
+        f"p95={percentile(durations, 95) * 1000:9.1f}ms  "
+        f"p99={percentile(durations, 99) * 1000:9.1f}ms"
+    )
+
+
+def make_update(bot, update_id, chat, text, mentions=()):
+    entities = [{"type": "bot_command", "offset": 0, "length": text.index("\n") if "\n" in text else len(text)}]
+    for mention in mentions:
+        offset = text.index("@" + mention)
+        entities.append({"type": "mention", "offset": offset, "length": len(mention) + 1})
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": int(chat), "type": "group"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+            "text": text,
+            "entities": entities,
+        }
+    }, bot)
+
+
+async def timed(durations, coroutine):
+    started_at = time.perf_counter()
+    await coroutine
+    durations.append(time.perf_counter() - started_at)
+
+
+async def run_benchmark(args):
+    config = {
+        "report_states_list": ["Todo", "In Progress", "In Review"],
+        "cron_expression": "*/2 * * * *",
+        "cron_timezone": "UTC",
+        "telegram_base_url": f"http://{args.host}:{args.telegram_port}/bot",
+        "report_snapshots_path": None,
+        "live_board_path": None,
+        "report_concurrency": args.concurrency,
+        "report_project_timeout": 600,
+        # Limits are lifted, the benchmark measures the bot and not Telegram flood control
+        "telegram_global_rate": 100000,
+        "telegram_global_burst": 100000,
+        "telegram_chat_rate": 100000,
+        "telegram_chat_burst": 100000,
+        "telegram_send_workers": args.concurrency,
+    }
+    members_map = {stubs.member_id(m): f"member{m}" for m in range(stubs.MEMBERS_COUNT)}
+    projects_map = {stubs.project_id(p): stubs.chat_id(p) for p in range(args.projects)}
+    mappings = MappingRegistry.from_maps(members_map, projects_map, config)
+    plane_api = PlaneAPI(
+        "bench-token", "bench", config, mappings, f"http://{args.host}:{args.plane_port}/", "info"
+    )
+    bot = PlaneNotifierBot("1:bench", "bench_bot", plane_api, config, mappings)
+    await bot.dispatcher.start()
+    await bot.application.initialize()
+
+    print(f"Scenario: {args.projects} projects x {args.issues} issues, concurrency {args.concurrency}")
+
+    # Scheduled reports for every project
+    durations = []
+    original_send_project_report = bot.send_project_report
+
+    async def send_project_report(project_id, chat_id):
+        await timed(durations, original_send_project_report(project_id, chat_id))
+
+    bot.send_project_report = send_project_report
+    started_at = time.perf_counter()
+    for _ in range(args.rounds):
+        await bot.send_report_to_chats()
+    print_result("send_report_to_chats", durations, time.perf_counter() - started_at, unit="projects")
+
+    telegram_bot = bot.application.bot
+    commands = {
+        "/getreport": lambda n, p: (bot.get_report, make_update(telegram_bot, n, stubs.chat_id(p), "/getreport")),
+        "/getreport fresh": lambda n, p: (
+            bot.get_report, make_update(telegram_bot, n, stubs.chat_id(p), "/getreport fresh")
+        ),
+        "/getstates": lambda n, p: (bot.get_states_list, make_update(telegram_bot, n, stubs.chat_id(p), "/getstates")),
+        "/newtask": lambda n, p: (bot.new_task, make_update(
+            telegram_bot, n, stubs.chat_id(p),
+            f"/newtask\nTitle: Benchmark task {n}\nDescription: created by benchmark\nPriority: 2\nState: Todo\n@member1",
+            mentions=["member1"]
+        )),
+        "/updatetask": lambda n, p: (bot.update_task, make_update(
+            telegram_bot, n, stubs.chat_id(p),
+            f"/updatetask\nUUID: {stubs.issue_id(p, n % args.issues)}\n"
+            f"Title: Renamed {n}\nState: In Review\n@member2",
+            mentions=["member2"]
+        )),
+    }
+    update_ids = iter(range(1, 10 ** 9))
+    for command, make in commands.items():
+        durations = []
+        started_at = time.perf_counter()
+        calls = [make(next(update_ids), n % args.projects) for n in range(args.commands)]
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def call(handler, update):
+            async with semaphore:
+                await timed(durations, handler(update, None))
+
+        await asyncio.gather(*(call(handler, update) for handler, update in calls))
+        # /getreport pages are delivered after the handler returns, the total includes them
+        await asyncio.gather(*bot.background_tasks, return_exceptions=True)
+        print_result(command, durations, time.perf_counter() - started_at)
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{'peak RSS':<24} {peak_rss_mb:.1f} MB")
+
+    await bot.application.shutdown()
+    await bot.dispatcher.stop()
+    await plane_api.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=500, help="issues per project")
+    parser.add_argument("--rounds", type=int, default=1, help="scheduled report runs")
+    parser.add_argument("--commands", type=int, default=100, help="calls of every command")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--plane-latency", type=float, default=0.0, help="seconds added to every Plane response")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="seconds added to every Telegram response")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--plane-port", type=int, default=18080)
+    parser.add_argument("--telegram-port", type=int, default=18081)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    ready = multiprocessing.Event()
+    stub_process = multiprocessing.Process(
+        target=stubs.run_stubs,
+        args=(args.host, args.plane_port, args.telegram_port, args.projects, args.issues,
+              args.plane_latency, args.telegram_latency),
+        kwargs={"ready": ready},
+        daemon=True,
+    )
+    stub_process.start()
+    try:
+        if not ready.wait(timeout=30):
+            raise RuntimeError("Stub servers didn't start")
+        asyncio.run(run_benchmark(args))
+    finally:
+        stub_process.terminate()
+
+
+if __name__ == "__main__":
+    main()
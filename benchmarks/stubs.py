@@ -0,0 +1,182 @@
+"""
+Stub Plane API and Telegram Bot API servers for benchmarks.
+
+Plane data is generated on the fly from indexes, so even 100 projects x 5000 issues cost no memory:
+issue `k` of project `p` has id `{p:08x}-0000-4000-8000-{k:012x}` and state `k % len(STATE_NAMES)`.
+"""
+import asyncio
+import itertools
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from bot.service.http_server import HttpServer, HttpResponse
+
+STATE_NAMES = ["Backlog", "Todo", "In Progress", "In Review", "Done"]
+MEMBERS_COUNT = 20
+
+
+def project_id(p):
+    return f"00000000-0000-4000-a000-{p:012x}"
+
+
+def state_id(p, s):
+    return f"{p:08x}-0000-4000-9000-{s:012x}"
+
+
+def issue_id(p, k):
+    return f"{p:08x}-0000-4000-8000-{k:012x}"
+
+
+def member_id(m):
+    return f"00000000-0000-4000-b000-{m:012x}"
+
+
+def chat_id(p):
+    return str(-1000000000000 - p)
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return HttpResponse(status=status, body=json.dumps(data).encode("utf-8"), content_type="application/json")
+
+
+class StubPlane:
+    """Serves the part of Plane API v1 used by the bot for `projects` projects with `issues` issues each"""
+
+    def __init__(self, projects, issues, latency=0.0, workspace_slug="bench"):
+        self.projects = projects
+        self.issues = issues
+        self.latency = latency
+        self.prefix = f"/api/v1/workspaces/{workspace_slug}/projects/"
+        self.created = itertools.count(issues)
+
+    def register(self, server: HttpServer):
+        for method in ("GET", "POST", "PATCH", "DELETE"):
+            server.add_route(method, self.prefix, self.handle, prefix=True)
+
+    def issue(self, p, k, fields=None):
+        issue = {
+            "id": issue_id(p, k),
+            "name": f"Generated issue {k} of project {p} with a moderately long title",
+            "state": state_id(p, k % len(STATE_NAMES)),
+            "assignees": [member_id(k % MEMBERS_COUNT), member_id((k + 7) % MEMBERS_COUNT)],
+            "priority": "medium",
+            "start_date": None,
+            "target_date": None,
+            "description_html": f"<p>Description of <b>issue {k}</b></p>",
+            "created_at": f"2024-01-01T00:00:00.{k:06d}Z",
+            "updated_at": f"2024-02-01T00:00:00.{k:06d}Z",
+            "project": project_id(p),
+        }
+        if fields:
+            issue = {field: issue.get(field) for field in fields}
+        return issue
+
+    async def handle(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        parts = [part for part in request.path[len(self.prefix):].split("/") if part]
+        if not parts:
+            return json_response({"results": [self.project(p) for p in range(self.projects)]})
+        p = int(parts[0][-12:], 16)
+        if p >= self.projects:
+            return json_response({"detail": "Not found"}, HTTPStatus.NOT_FOUND)
+        if len(parts) == 1:
+            return json_response(self.project(p))
+        if parts[1] == "states":
+            return json_response({"results": [
+                {"id": state_id(p, s), "name": name} for s, name in enumerate(STATE_NAMES)
+            ]})
+        if parts[1] == "issues" and len(parts) == 2:
+            if request.method == "POST":
+                data = json.loads(request.body)
+                return json_response({**self.issue(p, next(self.created)), **data}, HTTPStatus.CREATED)
+            return self.list_issues(p, request.query)
+        if parts[1] == "issues":
+            k = int(parts[2][-12:], 16)
+            if request.method == "DELETE":
+                return HttpResponse(status=HTTPStatus.NO_CONTENT)
+            issue = self.issue(p, k)
+            if request.method == "PATCH":
+                issue.update(json.loads(request.body))
+            return json_response(issue)
+        return json_response({"detail": "Not found"}, HTTPStatus.NOT_FOUND)
+
+    def project(self, p):
+        return {
+            "id": project_id(p),
+            "name": f"Bench project {p}",
+            "identifier": f"B{p}",
+            "project_lead": None,
+            "default_state": state_id(p, 1),
+            "members": [],
+        }
+
+    def list_issues(self, p, query):
+        per_page = int(query.get("per_page", 100))
+        offset = int(query.get("cursor", 0))
+        fields = [field for field in query.get("fields", "").split(",") if field]
+        states = {int(state[-12:], 16) for state in query.get("state", "").split(",") if state}
+        matching = (k for k in range(self.issues) if not states or k % len(STATE_NAMES) in states)
+        page = list(itertools.islice(matching, offset, offset + per_page + 1))
+        return json_response({
+            "results": [self.issue(p, k, fields) for k in page[:per_page]],
+            "next_cursor": str(offset + per_page),
+            "next_page_results": len(page) > per_page,
+        })
+
+
+class StubTelegram:
+    """Answers Bot API methods used by the bot with plausible results and counts the calls"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.message_ids = itertools.count(1)
+        self.calls = {}
+
+    def register(self, server: HttpServer):
+        server.add_route("POST", "/bot", self.handle, prefix=True)
+
+    async def handle(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        method = request.path.rsplit("/", 1)[-1]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if request.headers.get("content-type", "").startswith("application/json"):
+            params = json.loads(request.body or b"{}")
+        else:
+            params = {key: values[-1] for key, values in parse_qs(request.body.decode("utf-8")).items()}
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif method in ("sendMessage", "editMessageText"):
+            result = {
+                "message_id": int(params.get("message_id") or next(self.message_ids)),
+                "date": 0,
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "group"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return json_response({"ok": True, "result": result})
+
+    async def handle_calls(self, request):
+        return json_response(self.calls)
+
+
+async def serve(host, plane_port, telegram_port, projects, issues, plane_latency, telegram_latency, ready=None):
+    plane_server = HttpServer(host, plane_port)
+    StubPlane(projects, issues, plane_latency).register(plane_server)
+    telegram_server = HttpServer(host, telegram_port)
+    stub_telegram = StubTelegram(telegram_latency)
+    stub_telegram.register(telegram_server)
+    telegram_server.add_route("GET", "/calls", stub_telegram.handle_calls)
+    await plane_server.start()
+    await telegram_server.start()
+    if ready is not None:
+        ready.set()
+    await asyncio.Event().wait()
+
+
+def run_stubs(*args, ready=None):
+    """Entry point for a separate process, so stub CPU time doesn't skew the measured bot"""
+    asyncio.run(serve(*args, ready=ready))
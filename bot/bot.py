@@ -1,360 +1,806 @@
 import asyncio
+import collections
 import datetime
-import re
+import hashlib
+import hmac
+import json
+import time
 import traceback
 import logging
+from http import HTTPStatus
+from zoneinfo import ZoneInfo
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 from croniter import croniter
 from telegram import Bot, Update
+from telegram.error import BadRequest, TelegramError
 from telegram.ext import CallbackContext, Application, CommandHandler
 
+from bot.service import metrics
 from bot.service.api import PlaneAPI
+from bot.service.cluster import ClusterCoordinator
+from bot.service.mirror import PlaneMirror
+from bot.service.snapshots import ReportSnapshotStore
+from bot.service.dispatcher import TelegramDispatcher, PRIORITY_INTERACTIVE, PRIORITY_REPORT
+from bot.service.http_server import HttpServer, HttpRequest, HttpResponse
+from bot.service.mappings import MappingRegistry
+from bot.service.plane_webhooks import PlaneWebhookNotifier
+from bot.service.resilience import PlaneUnavailable
+from bot.utils.command_parser import CommandParser, CommandSyntaxError, format_syntax_errors, newtask_format, \
+    newtasks_format, updatetask_format, movetasks_format, assigntasks_format
 from bot.utils.logger_config import setup_logger, logger
-from bot.utils.utils import validate_dates, escape_markdown_v2, fail_emoji, index_to_priority, success_emoji, \
-    html_to_markdownV2, normalize_date
-from bot.utils.utils_tg import get_mentions_list
+from bot.utils.markdown import escape_markdown_v2, html_to_markdownV2, link, code
+from bot.utils.cache import SingleFlight, TTLCache
+from bot.utils.storage import JsonFileStore
+from bot.utils.utils import validate_dates, fail_emoji, success_emoji, paginate_report
 
 class PlaneNotifierBot:
-    def __init__(self, bot_token, bot_name, plane_api: PlaneAPI, config, members_map, projects_map):
+    def __init__(self, bot_token, bot_name, plane_api: PlaneAPI, config, mappings: MappingRegistry):
         self.bot_token = bot_token
         self.bot_name = bot_name
+        self.command_parser = CommandParser(bot_name)
 
-        self.members_map = members_map
-        self.project_to_chat_map = projects_map
-        self.chat_to_project_map = {projects_map[item]: item for item in projects_map}
+        # Members and projects mappings, reloaded in the background when their files change
+        self.mappings = mappings
 
         self.plane_api = plane_api
         self.cron_expression = config["cron_expression"]
         self.timezone = config["cron_timezone"]
+        self.report_concurrency = config.get("report_concurrency", 5)
+        self.report_project_timeout = config.get("report_project_timeout", 60)
+        # Limits of bulk commands like /newtasks
+        self.bulk_max_tasks = config.get("bulk_max_tasks", 50)
+        self.bulk_concurrency = config.get("bulk_concurrency", 5)
+        # full - whole report every run, skip_unchanged - whole report only if tasks changed, diff - only changes,
+        # live - one pinned message per chat edited in place
+        self.report_delivery = config.get("report_delivery", "full")
+        # Worker mode, replicas share projects and one of them leads the cron and Telegram polling
+        self.cluster = ClusterCoordinator(config) if config.get("cluster_enabled", False) else None
+        # Snapshots and live boards live in the cluster file in worker mode, they follow projects between workers
+        if self.cluster is not None:
+            self.report_snapshots = ReportSnapshotStore(store=self.cluster.store("report_snapshots"))
+            # chat_id -> ids and text hashes of live board messages, used with report_delivery: live
+            self.live_boards = self.cluster.store("live_boards")
+        else:
+            self.report_snapshots = ReportSnapshotStore(config.get("report_snapshots_path", "report_snapshots.json"))
+            self.live_boards = JsonFileStore(config.get("live_board_path", "live_board.json"))
+        # Reports and states are read from a local SQLite copy of Plane when enabled
+        self.mirror = PlaneMirror(plane_api, config) if config.get("mirror_enabled", False) else None
+        self.mirror_sync_interval = config.get("mirror_sync_interval", 60)
+        # Concurrent report fetches and renders of one project, e.g. /getreport during the cron run, share one
+        self.report_flights = SingleFlight()
+        # project_id -> (fetched at, project details, categorized tasks, report pages or None until rendered),
+        # served by /getreport and kept warm by the scheduled run
+        self.report_max_staleness = config.get("report_cache_max_staleness", 300)
+        self.report_refresh_after = config.get("report_cache_refresh_after", 60)
+        self.report_cache = TTLCache(maxsize=config.get("report_cache_size", 256), ttl=self.report_max_staleness)
+        # project_id -> number of issue changes made by the bot, data fetched before a change isn't cached
+        self.report_generations = collections.Counter()
+        self.background_tasks = set()
 
-        self.bot = Bot(token=self.bot_token)
-        self.application = Application.builder().token(bot_token).build()
+        # Bot API server, only changed for a local Bot API server or a stub in benchmarks
+        telegram_base_url = config.get("telegram_base_url", "https://api.telegram.org/bot")
+        self.bot = Bot(token=self.bot_token, base_url=telegram_base_url)
+        # Updates are handled concurrently, a command waiting on a slow Plane call doesn't hold up other chats
+        self.application = (
+            Application.builder()
+            .token(bot_token)
+            .base_url(telegram_base_url)
+            .concurrent_updates(config.get("telegram_concurrent_updates", 64))
+            .build()
+        )
+        self.dispatcher = TelegramDispatcher(config)
         self.stop_event = asyncio.Event()
 
+        # polling - bot asks Telegram for updates, webhook - Telegram pushes updates to the local listener
+        self.telegram_delivery = config.get("telegram_delivery", "polling")
+        self.webhook_url = config.get("webhook_url")
+        self.webhook_secret_token = config.get("webhook_secret_token")
+        self.http_servers = {}
+        if self.telegram_delivery == "webhook":
+            # Without the secret anyone reaching the port could post updates on behalf of any user
+            if not self.webhook_secret_token:
+                raise ValueError("webhook_secret_token is required when telegram_delivery is webhook")
+            self.add_http_route(
+                config.get("webhook_listen", "0.0.0.0"),
+                config.get("webhook_port", 8443),
+                "POST",
+                config.get("webhook_path", "/telegram"),
+                self.handle_telegram_webhook
+            )
+        # Warmup of Plane data at startup, commands are served meanwhile and readiness waits for it
+        self.warmup_timeout = config.get("warmup_timeout", 30)
+        self.warmup_task = None
+        self.ready = False
+        if config.get("health_port"):
+            self.add_http_route(
+                config.get("health_listen", "0.0.0.0"),
+                config["health_port"],
+                "GET",
+                "/ready",
+                self.handle_ready
+            )
+        if config.get("metrics_port"):
+            self.add_http_route(
+                config.get("metrics_listen", "0.0.0.0"),
+                config["metrics_port"],
+                "GET",
+                "/metrics",
+                metrics.registry.handle_metrics
+            )
+        # Exposed so alerts can compare report run duration with the schedule
+        cron = croniter(self.cron_expression)
+        first_run = cron.get_next(float)
+        metrics.report_cron_interval.set(cron.get_next(float) - first_run)
+
+        # Plane pushes issue changes, they are posted to the mapped chats as notifications
+        self.plane_webhooks = None
+        if config.get("plane_webhooks", False):
+            self.plane_webhooks = PlaneWebhookNotifier(
+                plane_api,
+                lambda project_id: self.project_to_chat_map.get(project_id),
+                lambda chat_id, text: self.send(chat_id, text, parse_mode="MarkdownV2"),
+                config
+            )
+            self.add_http_route(
+                config.get("plane_webhook_listen", "0.0.0.0"),
+                config.get("plane_webhook_port", 8080),
+                "POST",
+                config.get("plane_webhook_path", "/plane"),
+                self.plane_webhooks.handle_webhook
+            )
+
         self.application.add_handler(CommandHandler('newtask', self.new_task))
+        self.application.add_handler(CommandHandler('newtasks', self.new_tasks))
         self.application.add_handler(CommandHandler('updatetask', self.update_task))
         self.application.add_handler(CommandHandler('removetask', self.remove_task))
+        self.application.add_handler(CommandHandler('movetasks', self.move_tasks))
+        self.application.add_handler(CommandHandler('assigntasks', self.assign_tasks))
         self.application.add_handler(CommandHandler('getstates', self.get_states_list))
         self.application.add_handler(CommandHandler('getreport', self.get_report))
 
-    async def send_report_to_chats(self):
-        for project_id, chat_id in self.project_to_chat_map.items():
-            logger.info(f"Processing project UUID: {project_id} for chat UUID: {chat_id}")
+    async def reply(self, update: Update, text, **kwargs):
+        """Reply to a command message through the dispatcher, ahead of queued reports"""
+        return await self.dispatcher.submit(
+            update.message.chat_id,
+            lambda: update.message.reply_text(text, **kwargs),
+            priority=PRIORITY_INTERACTIVE
+        )
 
-            # Fetch project details
-            project_details = self.plane_api.get_project(project_id)
-            if not project_details:
-                logger.warning(f"No details found for project UUID: {project_id}. Skipping")
-                continue
+    async def send(self, chat_id, text, priority=PRIORITY_REPORT, **kwargs):
+        """Send a message to the chat through the dispatcher"""
+        return await self.dispatcher.submit(
+            chat_id,
+            lambda: self.bot.send_message(chat_id=chat_id, text=text, **kwargs),
+            priority=priority
+        )
 
-            # Fetch tasks categorized by status
-            categorized_tasks = self.plane_api.get_tasks_by_status_for_project(project_id)
-            if not categorized_tasks:
-                logger.warning(f"No categorized tasks found for project UUID: {project_id}. Skipping")
-                continue
-            if all((value is None or value == list()) for value in categorized_tasks.values()):
-                logger.warning(f"No categorized tasks found for project UUID: {project_id}. Skipping")
-                continue
+    async def send_report(self, chat_id, report, priority=PRIORITY_REPORT):
+        """Send report messages one by one, so they arrive in order"""
+        for page in report:
+            await self.send(chat_id, page, priority=priority, parse_mode="MarkdownV2")
 
-            # Generate report for the project
-            report = self.plane_api.generate_report_for_project(project_id, project_details, categorized_tasks)
-            logger.debug(report)
+    async def update_live_board(self, chat_id, report):
+        """
+        Keep the report as a pinned "live board" in the chat, editing its messages in place.
+
+        Messages whose text didn't change are not touched, missing ones are sent again,
+        and message ids are persisted so the board survives restarts.
+        """
+        board = self.live_boards.get(str(chat_id)) or {"message_ids": [], "hashes": []}
+        message_ids, hashes = board["message_ids"], board["hashes"]
+        new_message_ids, new_hashes = [], []
+        for index, page in enumerate(report):
+            page_hash = hashlib.sha256(page.encode("utf-8")).hexdigest()
+            message_id = message_ids[index] if index < len(message_ids) else None
+            if message_id is not None and (index >= len(hashes) or hashes[index] != page_hash):
+                try:
+                    await self.dispatcher.submit(
+                        chat_id,
+                        lambda text=page, edit_id=message_id: self.bot.edit_message_text(
+                            text=text, chat_id=chat_id, message_id=edit_id, parse_mode="MarkdownV2"
+                        )
+                    )
+                except BadRequest as e:
+                    if "not modified" not in e.message.lower():
+                        logger.warning(f"Live board message {message_id} in chat UUID: {chat_id} can't be edited, sending new one. Error: {e}")
+                        message_id = None
+            if message_id is None:
+                message = await self.send(chat_id, page, parse_mode="MarkdownV2")
+                message_id = message.message_id
+                if index == 0:
+                    try:
+                        await self.dispatcher.submit(
+                            chat_id,
+                            lambda: self.bot.pin_chat_message(
+                                chat_id=chat_id, message_id=message.message_id, disable_notification=True
+                            )
+                        )
+                    except TelegramError as e:
+                        logger.warning(f"Failed to pin live board in chat UUID: {chat_id}. Error: {e}")
+            new_message_ids.append(message_id)
+            new_hashes.append(page_hash)
+
+        # Report got shorter, drop messages that are no longer used
+        for message_id in message_ids[len(report):]:
+            try:
+                await self.dispatcher.submit(
+                    chat_id, lambda delete_id=message_id: self.bot.delete_message(chat_id=chat_id, message_id=delete_id)
+                )
+            except TelegramError as e:
+                logger.warning(f"Failed to delete live board message {message_id} in chat UUID: {chat_id}. Error: {e}")
+        self.live_boards.set(str(chat_id), {"message_ids": new_message_ids, "hashes": new_hashes})
+
+    @staticmethod
+    def issue_data(fields, state_id, assignees_ids):
+        """Plane issue payload from parsed command fields, fields not given are left out"""
+        issue_data = {
+            "name": fields.title,
+            "description_html": f"<body>{fields.description}</body>" if fields.description is not None else None,
+            "start_date": fields.start_date,
+            "target_date": fields.target_date,
+            "priority": fields.priority,
+            "state": state_id,
+            "assignees": assignees_ids
+        }
+        return {key: value for key, value in issue_data.items() if value is not None}
+
+    @staticmethod
+    def failure_details(result):
+        """Short reason of a failed Plane call from the error details returned by PlaneAPI"""
+        if isinstance(result, dict):
+            return f"failed, {result.get('status_code') or result.get('error_message')}"
+        return f"failed, {result}"
+
+    async def bulk_update(self, project_id, task_ids, build_patch):
+        """
+        Fetch issues and update them concurrently, at most bulk_concurrency Plane requests at a time.
+
+        Args:
+            project_id (str): The ID of the project the issues belong to.
+            task_ids (list[str]): Issues to update.
+            build_patch (Callable[[dict], dict | None]): Update data for an issue, None if it needs no change.
+
+        Returns:
+            list[tuple]: (task_id, old issue, updated issue, error) in task_ids order, updated issue and error
+            are None for issues which needed no change.
+        """
+        semaphore = asyncio.Semaphore(self.bulk_concurrency)
+
+        async def process(task_id):
             try:
-                # Send report to the chat
-                logger.info(f"Successfully sent report for project UUID: {project_id} to chat UUID: {chat_id}")
-                await self.bot.send_message(chat_id=chat_id, text=report, parse_mode="MarkdownV2")
+                async with semaphore:
+                    old_task = await self.plane_api.get_task_by_uuid(project_id, task_id)
+                if old_task is None:
+                    return task_id, None, None, "not found"
+                patch = build_patch(old_task)
+                if not patch:
+                    return task_id, old_task, None, None
+                async with semaphore:
+                    success, result = await self.plane_api.update_issue(project_id, task_id, patch)
+                if not success:
+                    return task_id, old_task, None, self.failure_details(result)
+                self.issue_changed(project_id, task_id, result)
+                return task_id, old_task, result, None
             except Exception as e:
-                logger.error(f"Failed to send report to chat UUID: {chat_id} for project UUID: {project_id}. Error: {e}")
-                error_reply = fail_emoji + escape_markdown_v2(" Failed to send report")
-                if self.plane_api.mode.upper() == "DEBUG":
-                    error_reply += escape_markdown_v2(f"\nError details : {e}")
-                await self.bot.send_message(chat_id=chat_id, text=error_reply, parse_mode="MarkdownV2")
+                logger.error(f"Error updating issue {task_id} in project {project_id}: {e}")
+                return task_id, None, None, self.failure_details(str(e))
+
+        return await asyncio.gather(*(process(task_id) for task_id in task_ids))
+
+    async def reply_bulk_summary(self, update, project_id, title, results, describe):
+        """
+        Reply with one message (or pages) listing changed, unchanged and failed issues of a bulk command.
+
+        Args:
+            update (Update): Command update to reply to.
+            project_id (str): The ID of the project the issues belong to.
+            title (str): Summary title, e.g. "Moved to In Review", not escaped.
+            results (list[tuple]): Result of bulk_update.
+            describe (Callable[[dict, dict], str]): MarkdownV2 diff of an issue from its old and updated versions.
+        """
+        md_v2 = escape_markdown_v2
+        task_url = f"{self.plane_api.base_url}{self.plane_api.workspace_slug}/projects/{project_id}/issues/"
+        changed, unchanged, failed = [], [], []
+        for task_id, old_task, updated_task, error in results:
+            if error is not None:
+                name = f"{md_v2(old_task['name'])} " if old_task else ""
+                failed.append(f"• {name}{code(task_id)}: {md_v2(error)}")
+            elif updated_task is None:
+                unchanged.append(f"• {link(old_task['name'], task_url + task_id)}")
+            else:
+                changed.append(f"• {link(updated_task['name'], task_url + task_id)}: {describe(old_task, updated_task)}")
+        emoji = success_emoji if not failed else fail_emoji
+        header = emoji + md_v2(f" {title}: {len(changed)} of {len(results)} tasks") + "\n"
+        sections = [
+            (heading, entries)
+            for heading, entries in (("*Changed*:", changed), ("*Already up to date*:", unchanged), ("*Failed*:", failed))
+            if entries
+        ]
+        for page in paginate_report(header, sections):
+            await self.reply(update, page, parse_mode="MarkdownV2")
+
+    @property
+    def members_map(self):
+        return self.mappings.current.members
+
+    @property
+    def project_to_chat_map(self):
+        return self.mappings.current.projects
+
+    @property
+    def chat_to_project_map(self):
+        return self.mappings.current.chats
+
+    def find_member_ids(self, names):
+        """
+        Returns:
+            tuple[list, list]: Plane ids of members with these Telegram usernames, case-insensitive,
+            and the names not found.
+        """
+        return self.mappings.current.find_member_ids(names)
+
+    def report_source(self, project_id):
+        """Local mirror once it holds the project, Plane API otherwise"""
+        if self.mirror is not None and self.mirror.is_synced(project_id):
+            return self.mirror
+        return self.plane_api
+
+    def issue_changed(self, project_id, issue_id, issue=None):
+        """Called after the bot itself created, updated (issue is given) or removed (issue is None) an issue"""
+        self.report_generations[project_id] += 1
+        self.report_cache.invalidate(project_id)
+        self.plane_api.forget_inflight_tasks(project_id)
+        if self.mirror is not None:
+            if issue is None:
+                self.mirror.delete_issue(issue_id)
+            else:
+                self.mirror.upsert_issue(project_id, issue)
+
+    async def sync_mirror(self):
+        await self.mirror.sync_all(list(self.project_to_chat_map.keys()))
+
+    def cron_tick(self):
+        """Scheduled time of the current cron run, the same on every worker"""
+        now = datetime.datetime.now(ZoneInfo(self.timezone)) + datetime.timedelta(seconds=1)
+        return croniter(self.cron_expression, now).get_prev(datetime.datetime).isoformat()
+
+    async def cluster_heartbeat(self):
+        """Renew cluster membership, only the leader polls Telegram since a bot allows one getUpdates consumer"""
+        is_leader = self.cluster.heartbeat()
+        metrics.cluster_leader.set(int(is_leader))
+        metrics.cluster_workers.set(len(self.cluster.ring.nodes))
+        if self.telegram_delivery != "polling" or not self.application.running:
+            return
+        if is_leader and not self.application.updater.running:
+            logger.info("Starting Telegram polling on the leader")
+            await self.application.updater.start_polling()
+        elif not is_leader and self.application.updater.running:
+            logger.info("Stopping Telegram polling, leadership lost")
+            await self.application.updater.stop()
+
+    async def send_cluster_reports(self):
+        """
+        Cron job in worker mode: report projects this worker owns on the hash ring, then, on the leader,
+        projects of this run nobody claimed within the lease TTL, e.g. because their owner died.
+        """
+        tick = self.cron_tick()
+        started_at = asyncio.get_running_loop().time()
+        await self.send_report_to_chats(
+            [project_id for project_id in self.project_to_chat_map if self.cluster.owns(project_id)], tick
+        )
+        if not self.cluster.is_leader:
+            return
+        await asyncio.sleep(max(0.0, self.cluster.lease_ttl - (asyncio.get_running_loop().time() - started_at)))
+        orphans = self.cluster.unclaimed(list(self.project_to_chat_map), tick)
+        if orphans:
+            logger.warning(f"Reporting {len(orphans)} projects left unclaimed in the run of {tick}")
+            await self.send_report_to_chats(orphans, tick)
+
+    async def send_report_to_chats(self, project_ids=None, tick=None):
+        """
+        Send scheduled reports.
+
+        Args:
+            project_ids (list[str] | None): Projects to report, every mapped project when None.
+            tick (str | None): Cron run in worker mode, a project is reported only if this worker claims it first.
+        """
+        projects = self.project_to_chat_map
+        if project_ids is not None:
+            projects = {project_id: projects[project_id] for project_id in project_ids if project_id in projects}
+        # Projects are processed concurrently, one slow or failing project doesn't hold back the others
+        semaphore = asyncio.Semaphore(self.report_concurrency)
+
+        async def process(project_id, chat_id):
+            async with semaphore:
+                # Claimed right before sending, projects left unsent by a dying worker stay free for the leader
+                if tick is not None and not self.cluster.claim_report(project_id, tick):
+                    return
+                try:
+                    with metrics.report_project_seconds.time(project_id=project_id):
+                        await asyncio.wait_for(
+                            self.send_project_report(project_id, chat_id),
+                            timeout=self.report_project_timeout
+                        )
+                except PlaneUnavailable as e:
+                    metrics.report_project_errors.inc(project_id=project_id, reason="plane_unavailable")
+                    logger.warning(f"Report for project UUID: {project_id} skipped: {e}")
+                except asyncio.TimeoutError:
+                    metrics.report_project_errors.inc(project_id=project_id, reason="timeout")
+                    logger.error(f"Report for project UUID: {project_id} timed out after {self.report_project_timeout}s")
+                except Exception as e:
+                    metrics.report_project_errors.inc(project_id=project_id, reason="error")
+                    logger.error(f"Failed to process report for project UUID: {project_id}. Error: {e} \n Traceback:{traceback.format_exc()}")
+
+        with metrics.report_run_seconds.time():
+            try:
+                await asyncio.gather(*(process(project_id, chat_id) for project_id, chat_id in projects.items()))
+            finally:
+                # One write per run instead of rewriting the whole file after every project
+                await self.report_snapshots.flush()
 
+    async def fetch_report_data(self, project_id):
+        """
+        Fetch what a report is built from, concurrent calls for one project share a single fetch.
+
+        Returns:
+            tuple: (project details, tasks categorized by status), None for what can't be fetched.
+        """
+        generation = self.report_generations[project_id]
+
+        async def fetch():
+            fetched_at = time.monotonic()
+            source = self.report_source(project_id)
+            project_details = await source.get_project(project_id)
+            if not project_details:
+                return None, None
+            categorized_tasks = await source.get_tasks_by_status_for_project(project_id)
+            if categorized_tasks and self.report_generations[project_id] == generation:
+                self.report_cache.set(project_id, (fetched_at, project_details, categorized_tasks, None))
+            return project_details, categorized_tasks
+
+        return await self.report_flights.do(("data", project_id, generation), fetch)
+
+    async def render_report(self, project_id):
+        """
+        Fetch and render the full report of a project, concurrent calls for one project share a single render.
+
+        Returns:
+            tuple: (project details, categorized tasks, report pages), None for what can't be fetched or rendered.
+        """
+        generation = self.report_generations[project_id]
+
+        async def render():
+            project_details, categorized_tasks = await self.fetch_report_data(project_id)
+            if not project_details or not categorized_tasks:
+                return project_details, categorized_tasks, None
+            report = self.plane_api.generate_report_for_project(project_id, project_details, categorized_tasks)
+            self.cache_rendered_report(project_id, categorized_tasks, report)
+            return project_details, categorized_tasks, report
+
+        return await self.report_flights.do(("report", project_id, generation), render)
+
+    def cache_rendered_report(self, project_id, categorized_tasks, report):
+        """Attach report pages to the cache entry of the data they were rendered from"""
+        entry = self.report_cache.get(project_id)
+        if entry is not None and entry[2] is categorized_tasks:
+            self.report_cache.set(project_id, entry[:3] + (report,))
+
+    async def cached_report(self, project_id, fresh=False):
+        """
+        Report for /getreport, from the cache unless it's older than report_cache_max_staleness or fresh is set.
+
+        Entries older than report_cache_refresh_after are still served, and refreshed in the background.
+
+        Args:
+            project_id (str): The ID of the project to report.
+            fresh (bool): Fetch from Plane, ignoring the cache.
+
+        Returns:
+            tuple: (project details, categorized tasks, report pages), None for what can't be fetched or rendered.
+        """
+        entry = None if fresh else self.report_cache.get(project_id)
+        if entry is not None:
+            fetched_at, project_details, categorized_tasks, report = entry
+            age = time.monotonic() - fetched_at
+            if age <= self.report_max_staleness:
+                if report is None:
+                    # Scheduled runs in diff, skip_unchanged and live modes cache data without a full render
+                    report = self.plane_api.generate_report_for_project(project_id, project_details, categorized_tasks)
+                    self.cache_rendered_report(project_id, categorized_tasks, report)
+                if age > self.report_refresh_after:
+                    self.refresh_report_in_background(project_id)
+                return project_details, categorized_tasks, report
+        return await self.render_report(project_id)
+
+    def run_in_background(self, coroutine, description):
+        def done(task):
+            self.background_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"{description} failed: {task.exception()}")
+
+        task = asyncio.create_task(coroutine)
+        # Referenced until done, the event loop keeps only weak references to tasks
+        self.background_tasks.add(task)
+        task.add_done_callback(done)
+
+    def refresh_report_in_background(self, project_id):
+        self.run_in_background(
+            self.render_report(project_id), f"Background refresh of report for project UUID: {project_id}"
+        )
+
+    async def send_project_report(self, project_id, chat_id):
+        logger.info(f"Processing project UUID: {project_id} for chat UUID: {chat_id}")
+
+        # Full reports are rendered once for everyone asking at the same time, other modes render per snapshot
+        report = None
+        if self.report_delivery == "full":
+            project_details, categorized_tasks, report = await self.render_report(project_id)
+        else:
+            project_details, categorized_tasks = await self.fetch_report_data(project_id)
+        if not project_details:
+            logger.warning(f"No details found for project UUID: {project_id}. Skipping")
+            return
+        if not categorized_tasks:
+            logger.warning(f"No categorized tasks found for project UUID: {project_id}. Skipping")
+            return
+        # Previous snapshot is only needed when unchanged reports are skipped or reduced to changes
+        previous = self.report_snapshots.get(project_id) if self.report_delivery != "full" else None
+        if all((value is None or value == list()) for value in categorized_tasks.values()) and not previous:
+            logger.warning(f"No categorized tasks found for project UUID: {project_id}. Skipping")
+            return
+
+        # Generate report for the project
+        snapshot = ReportSnapshotStore.build_snapshot(categorized_tasks)
+        if previous == snapshot:
+            logger.info(f"Report for project UUID: {project_id} is unchanged. Skipping")
+            return
+        if self.report_delivery == "diff" and previous is not None:
+            changes = ReportSnapshotStore.diff(previous, snapshot)
+            report = self.plane_api.generate_changes_report_for_project(
+                project_id, project_details, previous, snapshot, changes
+            )
+        elif report is None:
+            report = self.plane_api.generate_report_for_project(project_id, project_details, categorized_tasks)
+        logger.debug(report)
+        try:
+            # Send report to the chat
+            if self.report_delivery == "live":
+                await self.update_live_board(chat_id, report)
+            else:
+                await self.send_report(chat_id, report)
+            if self.report_delivery != "full":
+                self.report_snapshots.save(project_id, snapshot)
+            logger.info(f"Successfully sent report for project UUID: {project_id} to chat UUID: {chat_id}")
+        except Exception as e:
+            logger.error(f"Failed to send report to chat UUID: {chat_id} for project UUID: {project_id}. Error: {e}")
+            error_reply = fail_emoji + escape_markdown_v2(" Failed to send report")
+            if self.plane_api.mode.upper() == "DEBUG":
+                error_reply += escape_markdown_v2(f"\nError details : {e}")
+            await self.send(chat_id, error_reply, parse_mode="MarkdownV2")
+
+    @metrics.track_command('getstates')
     async def get_states_list(self, update: Update, context: CallbackContext):
         try:
             project_id = self.chat_to_project_map[str(update.message.chat_id)]
-            states = self.plane_api.get_task_states_ids(project_id)
-            self.plane_api.get_tasks_by_status_for_project(project_id)
-            logger.debug(f"states received :{states}")
-            if states:
-                await update.message.reply_text(
-                    "\n".join(self.plane_api.map_states_by_ids(project_id).values())
-                )
+            states_map = await self.report_source(project_id).map_states_by_ids(project_id)
+            logger.debug(f"states received :{states_map}")
+            if states_map:
+                await self.reply(update, "\n".join(states_map.values()))
             else:
-                await update.message.reply_text("An error occurred while getting states, try again")
+                await self.reply(update, "An error occurred while getting states, try again")
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
         except Exception as e:
+            metrics.command_errors.inc(command='getstates')
             logger.error(f"Error handling /getstates command: {e}, ${e.__cause__}")
-            await update.message.reply_text(
-                "An error occurred while getting states, try again")
+            await self.reply(update, "An error occurred while getting states, try again")
         return
 
+    @metrics.track_command('newtask')
     async def new_task(self, update: Update, context: CallbackContext):
         try:
             md_v2 = escape_markdown_v2
-            # Validate the command pattern
-            command_text = update.message.text
-            new_task_pattern = re.compile(rf'^/newtask(?:@{self.bot_name})?[\s,]*')
-            match = new_task_pattern.match(command_text)
-            fail_replay = ( fail_emoji +
-                      " Invalid format. Use:\n"
-                      "/newtask\n"
-                      "Title: <task-title> (max length = 255)\n"
-                      "Description: <task-description>\n"
-                      "Start: <task-start-date> (YYYY-MM-DD)\n"
-                      "Deadline: <task-deadline-date> (YYYY-MM-DD)\n"
-                      "Priority: <(lowest)0->1->2->3->4(highest)>\n"
-                      "State: <state-name> (check with /getstates)\n"
-                      "@assignees_names"
-                      )
-            if match is None :
-                await update.message.reply_text(md_v2(fail_replay), parse_mode="MarkdownV2")
+            # Parse and validate the command
+            try:
+                fields = self.command_parser.parse_task(update.message.text, required=("title",))
+            except CommandSyntaxError as e:
+                await self.reply(update, md_v2(format_syntax_errors(e, newtask_format)), parse_mode="MarkdownV2")
                 return
-            # Parse the command
             project_id = self.chat_to_project_map.get(str(update.message.chat_id))
             if project_id is None:
                 replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
-                return
-            test_parse_task = self.parse_newtask_message(message=update.message.text)
-
-            task_name : str = test_parse_task.get("title")
-            task_description = test_parse_task.get("description")
-            start_date = test_parse_task.get("start")
-            target_date = test_parse_task.get("deadline")
-            priority_id = test_parse_task.get("priority")
-            state = test_parse_task.get("state")
-
-            #Validate title
-            if task_name is None or task_name == "" :
-                await update.message.reply_text(md_v2(fail_replay), parse_mode="MarkdownV2")
-                return
-            if len(task_name) >=255 :
-                await update.message.reply_text(md_v2(fail_emoji + f"Max title length is 255 symbols,your title length is {len(task_name)}"), parse_mode="MarkdownV2")
-                return
-             # Validate priority
-            priority = index_to_priority.get(priority_id)
-            if priority is None and priority_id is not None :
-                await update.message.reply_text(md_v2((fail_emoji + " Invalid priority, use one from range : (lowest)0->1->2->3->4(highest)")), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
 
             # Validate state and state_id
-            state_id = {v: k for k, v in self.plane_api.map_states_by_ids(project_id).items()}.get(state)
-            if state is not None and state_id is None:
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid state, check /getstates and try again"), parse_mode="MarkdownV2")
-                return
-
-            # Validate dates
-            start_date_fixed = normalize_date(start_date)
-            target_date_fixed = normalize_date(target_date)
-            if (not start_date_fixed and start_date) or (not target_date_fixed and target_date):
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
+            state_id = await self.plane_api.find_state_id(project_id, fields.state) if fields.state is not None else None
+            if fields.state is not None and state_id is None:
+                await self.reply(update, md_v2(fail_emoji + " Invalid state, check /getstates and try again"), parse_mode="MarkdownV2")
                 return
-            if not validate_dates(start_date_fixed, target_date_fixed):
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
-                return
-            start_date = start_date_fixed
-            target_date = target_date_fixed
             # Validate assignees
-            assignees = get_mentions_list(update)
-            inv_member_map = {v: k for k, v in self.members_map.items()}
-            assignees_ids = list()
-            invalid_names_list = list()
-            for assignee_name in assignees:
-                if inv_member_map.get(assignee_name):
-                    assignees_ids.append(inv_member_map.get(assignee_name))
-                else:
-                    invalid_names_list.append(assignee_name)
-            if invalid_names_list and assignees:
+            assignees_ids, invalid_names_list = self.find_member_ids(fields.assignees)
+            if invalid_names_list:
                 replay = fail_emoji + f" Can't find assignees ids :"
                 for name in invalid_names_list:
                     replay += f"\n @{name}"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
 
-            # Prepare issue data
-            task_data = {
-                "name": task_name,
-                "description_html": f"<body>{task_description}</body>" if task_description is not None else None,
-                "start_date": start_date,
-                "target_date": target_date,
-                "priority": priority_id,
-                "state": state_id,
-                "assignees": assignees_ids
-            }
-
-            # Clean empty values
-            for key, value in list(task_data.items()):
-                if value is None:
-                    task_data.pop(key)
+            task_data = self.issue_data(fields, state_id, assignees_ids)
 
             # Create the issue via Plane API
-            success , result = self.plane_api.create_issue(project_id, task_data)
+            success , result = await self.plane_api.create_issue(project_id, task_data)
             if success:
-                replay = self.construct_new_replay(new_task=result, project_id=project_id)
-                await update.message.reply_text(replay, parse_mode="MarkdownV2")
+                self.issue_changed(project_id, result["id"], result)
+                replay = await self.construct_new_replay(new_task=result, project_id=project_id)
+                await self.reply(update, replay, parse_mode="MarkdownV2")
             else:
                 error_reply = fail_emoji + " Failed to create the task, try again"
                 if self.plane_api.mode.upper() == "DEBUG":
                     error_reply += f"\nDetails : ${result}"
-                await update.message.reply_text(md_v2(error_reply), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(error_reply), parse_mode="MarkdownV2")
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
         except Exception as e:
+            metrics.command_errors.inc(command='newtask')
             logger.error(f"Error handling /newtask command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()} ")
             error_reply = fail_emoji + " An error occurred while creating the task, check your input and try again"
             if self.plane_api.mode.upper() == "DEBUG":
                 error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
-            await update.message.reply_text(escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
+            await self.reply(update, escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
 
-    async def update_task(self, update: Update, context: CallbackContext):
+    @metrics.track_command('newtasks')
+    async def new_tasks(self, update: Update, context: CallbackContext):
         try:
             md_v2 = escape_markdown_v2
-            # Validate the command
-            command_text = update.message.text
-            update_task_pattern = re.compile(re.compile(rf'^/updatetask(?:@{self.bot_name})?[\s,]*'
-                r'\nUUID\s*:?\s*(?P<id>\S{8}-\S{4}-\S{4}-\S{4}-\S{12})[\s,]*'))
-
-            match = update_task_pattern.match(command_text)
-            fail_replay = ( fail_emoji +
-                    " Invalid format. Use:\n"
-                    "/updatetask\n"
-                    "UUID: <task-UUID> (max length = 255)\n"
-                    "Title: <task-title>\n"
-                    "Description: <task-description>\n"
-                    "Start: <task-start-date> (YYYY-MM-DD)\n"
-                    "Deadline: <task-deadline-date> (YYYY-MM-DD)\n"
-                    "Priority: <(lowest)0->1->2->3->4(highest)>\n"
-                    "State: <state-name> (check with /getstates)\n"
-                    "@assignees_names"
-                    )
-            if match is None:
-                await update.message.reply_text(md_v2(fail_replay), parse_mode="MarkdownV2")
+            # Every task is validated before anything is created
+            try:
+                tasks = self.command_parser.parse_tasks(update.message.text)
+            except CommandSyntaxError as e:
+                await self.reply(update, md_v2(format_syntax_errors(e, newtasks_format)), parse_mode="MarkdownV2")
+                return
+            if len(tasks) > self.bulk_max_tasks:
+                replay = fail_emoji + f" Too many tasks: {len(tasks)}, send at most {self.bulk_max_tasks} in one message"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
-            # Parse the command
             project_id = self.chat_to_project_map.get(str(update.message.chat_id))
             if project_id is None:
                 replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
-            new_parse_task = self.parse_updatetask_message(message=update.message.text)
-            task_id = new_parse_task.get("id")
-            new_task_title = new_parse_task.get("title")
-            new_task_description = new_parse_task.get("description")
-            new_start_date = new_parse_task.get("start")
-            new_target_date = new_parse_task.get("deadline")
-            new_priority_id = new_parse_task.get("priority")
-            new_state = new_parse_task.get("state")
-
-            uuid_pattern = re.compile(r'\s*(\S{8}-\S{4}-\S{4}-\S{4}-\S{12})[\s,]*')
-            if task_id is None or uuid_pattern.fullmatch(task_id) is None :
-                replay = fail_emoji + " Task id's incorrect"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
-                return
-            if new_task_title == "":
-                replay = fail_emoji + " Task title cant be empty"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
+
+            state_ids = await self.plane_api.find_state_ids(
+                project_id, {task.state for task in tasks if task.state is not None}
+            )
+            errors = []
+            tasks_data = []
+            for number, task in enumerate(tasks, start=1):
+                if task.state is not None and state_ids[task.state] is None:
+                    errors.append(f"Task {number}: Invalid state '{task.state}', check /getstates")
+                assignees_ids, invalid_names_list = self.find_member_ids(task.assignees)
+                if invalid_names_list:
+                    errors.append(f"Task {number}: Can't find assignees ids: @{', @'.join(invalid_names_list)}")
+                tasks_data.append(self.issue_data(task, state_ids.get(task.state), assignees_ids))
+            if errors:
+                replay = fail_emoji + " Nothing was created:\n" + "\n".join(f"  • {error}" for error in errors)
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
-            if new_task_title is not None and len(new_task_title) >=255 :
-                await update.message.reply_text(md_v2(fail_emoji + f"Max title length is 255 symbols,your title length is {len(new_task_title)}"), parse_mode="MarkdownV2")
+
+            semaphore = asyncio.Semaphore(self.bulk_concurrency)
+
+            async def create(task_data):
+                async with semaphore:
+                    try:
+                        return await self.plane_api.create_issue(project_id, task_data)
+                    except Exception as e:
+                        logger.error(f"Error creating issue in project {project_id}: {e}")
+                        return False, str(e)
+
+            results = await asyncio.gather(*(create(task_data) for task_data in tasks_data))
+
+            task_url = f"{self.plane_api.base_url}{self.plane_api.workspace_slug}/projects/{project_id}/issues/"
+            created, failed = [], []
+            for task, (success, result) in zip(tasks, results):
+                if success:
+                    self.issue_changed(project_id, result["id"], result)
+                    created.append(f"• {link(result['name'], task_url + result['id'])} {code(result['id'])}")
+                else:
+                    failed.append(f"• {md_v2(task.title)}: {md_v2(self.failure_details(result))}")
+            emoji = success_emoji if not failed else fail_emoji
+            header = emoji + md_v2(f" Created {len(created)} of {len(tasks)} tasks") + "\n"
+            sections = [(heading, entries) for heading, entries in (("*Created*:", created), ("*Failed*:", failed))
+                        if entries]
+            for page in paginate_report(header, sections):
+                await self.reply(update, page, parse_mode="MarkdownV2")
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
+        except Exception as e:
+            metrics.command_errors.inc(command='newtasks')
+            logger.error(f"Error handling /newtasks command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()} ")
+            error_reply = fail_emoji + " An error occurred while creating the tasks, check your input and try again"
+            if self.plane_api.mode.upper() == "DEBUG":
+                error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
+            await self.reply(update, escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
+
+    @metrics.track_command('updatetask')
+    async def update_task(self, update: Update, context: CallbackContext):
+        try:
+            md_v2 = escape_markdown_v2
+            # Parse and validate the command
+            try:
+                fields = self.command_parser.parse_task(update.message.text, required=("task_id",))
+            except CommandSyntaxError as e:
+                await self.reply(update, md_v2(format_syntax_errors(e, updatetask_format)), parse_mode="MarkdownV2")
                 return
-            # Validate priority
-            new_priority = index_to_priority.get(new_priority_id)
-            if new_priority is None and new_priority_id is not None :
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid priority, use one from range : (lowest)0->1->2->3->4(highest)"), parse_mode="MarkdownV2")
+            project_id = self.chat_to_project_map.get(str(update.message.chat_id))
+            if project_id is None:
+                replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
+            task_id = fields.task_id
+
             # Validate state and state_id
-            new_state_id = {v: k for k, v in self.plane_api.map_states_by_ids(project_id).items()}.get(new_state)
-            if new_state is not None and new_state_id is None:
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid state, check /getstates and try again"), parse_mode="MarkdownV2")
-                return
-            # Validate dates
-            start_date_fixed = normalize_date(new_start_date)
-            target_date_fixed = normalize_date(new_target_date)
-            if (not start_date_fixed and new_start_date) or (not target_date_fixed and new_target_date):
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
+            new_state_id = await self.plane_api.find_state_id(project_id, fields.state) if fields.state is not None else None
+            if fields.state is not None and new_state_id is None:
+                await self.reply(update, md_v2(fail_emoji + " Invalid state, check /getstates and try again"), parse_mode="MarkdownV2")
                 return
-            if not validate_dates(start_date_fixed, target_date_fixed):
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
-                return
-            new_start_date = start_date_fixed
-            new_target_date = target_date_fixed
             # Validate assignees
-            new_assignees = get_mentions_list(update)
-            inv_member_map = {v: k for k, v in self.members_map.items()}
-            new_assignees_ids = list()
-            invalid_names_list = list()
-            for assignee_name in new_assignees:
-                if inv_member_map.get(assignee_name):
-                    new_assignees_ids.append(inv_member_map.get(assignee_name))
-                else:
-                    invalid_names_list.append(assignee_name)
-            if invalid_names_list and new_assignees:
+            new_assignees_ids, invalid_names_list = self.find_member_ids(fields.assignees)
+            if invalid_names_list:
                 replay = fail_emoji + f" Can't find assignees ids :"
                 for name in invalid_names_list:
                     replay += f"\n @{name}"
-                await update.message.reply_text(md_v2(replay), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
                 return
 
             # Get old version of task
-            old_task = self.plane_api.get_task_by_uuid(project_id, task_id)
+            old_task = await self.plane_api.get_task_by_uuid(project_id, task_id)
             if old_task is None:
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid issue UUID, try again"), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(fail_emoji + " Invalid issue UUID, try again"), parse_mode="MarkdownV2")
                 return
 
             # Filter new assignees
             assignees_ids = list(set(new_assignees_ids + old_task.get("assignees")))
             # Validate dates
-            if not validate_dates(new_start_date, new_target_date, old_task):
-                await update.message.reply_text(md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
+            if not validate_dates(fields.start_date, fields.target_date, old_task):
+                await self.reply(update, md_v2(fail_emoji + " Invalid dates, try again"), parse_mode="MarkdownV2")
                 return
 
-            # Prepare issue data
-            new_task_data = {
-                "name": new_task_title,
-                "description_html": f"<body>{new_task_description}</body>" if new_task_description is not None else None,
-                "start_date": new_start_date,
-                "target_date": new_target_date,
-                "priority": new_priority,
-                "state": new_state_id,
-                "assignees": assignees_ids
-            }
-
-            # Clean empty values
-            for key, value in list(new_task_data.items()):
-                if value is None:
-                    new_task_data.pop(key)
+            new_task_data = self.issue_data(fields, new_state_id, assignees_ids)
 
             # Update the issue via Plane API
-            success,result = self.plane_api.update_issue(project_id, task_id, new_task_data)
+            success,result = await self.plane_api.update_issue(project_id, task_id, new_task_data)
             if success:
-                replay = self.construct_update_replay(updated_task=result, old_task=old_task, project_id=project_id)
-                await update.message.reply_text(replay, parse_mode="MarkdownV2")
+                self.issue_changed(project_id, task_id, result)
+                replay = await self.construct_update_replay(updated_task=result, old_task=old_task, project_id=project_id)
+                await self.reply(update, replay, parse_mode="MarkdownV2")
             else:
                 error_reply = fail_emoji + " Failed to update the task, try again"
                 if self.plane_api.mode.upper() == "DEBUG":
                     error_reply += f"\nDetails: ${result}"
-                await update.message.reply_text(md_v2(error_reply), parse_mode="MarkdownV2")
+                await self.reply(update, md_v2(error_reply), parse_mode="MarkdownV2")
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
         except Exception as e:
+            metrics.command_errors.inc(command='updatetask')
             logger.error(f"Error handling /updatetask command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}")
             error_reply = fail_emoji + " An error occurred while updating the task. Please check your input and try again"
             if self.plane_api.mode.upper() == "DEBUG":
                 error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
-            await update.message.reply_text(escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
+            await self.reply(update, escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
 
+    @metrics.track_command('removetask')
     async def remove_task(self, update: Update, context: CallbackContext):
         try:
-            # Pattern for command
-            remove_task_pattern = re.compile(
-                rf'^/removetask(?:@{self.bot_name})?[\s,]*'
-                r'(\nUUID\s*:)?\s*(?P<id>\S{8}-\S{4}-\S{4}-\S{4}-\S{12})[\s,]*'
-                , re.MULTILINE)
-
             # Validate the command pattern
-            command_text = update.message.text
-            match = remove_task_pattern.fullmatch(command_text)
-            if not match:
-                await update.message.reply_text(
+            task_id = self.command_parser.parse_task_id(update.message.text)
+            if task_id is None:
+                await self.reply(
+                    update,
                     fail_emoji +
                     " Invalid format. Use:\n"
                     "/removetask <task-uuid>\n"
@@ -365,32 +811,149 @@ class PlaneNotifierBot:
             project_id = self.chat_to_project_map.get(str(update.message.chat_id))
             if project_id is None:
                 replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
-                await update.message.reply_text(replay)
+                await self.reply(update, replay)
                 return
-            task_id = match.group("id")
             # Check if issue exist
-            issue_to_delete = self.plane_api.get_task_by_uuid(project_id, task_id)
+            issue_to_delete = await self.plane_api.get_task_by_uuid(project_id, task_id)
             if issue_to_delete is None :
                 replay = fail_emoji + " Task with provided uuid doesnt exist"
-                await update.message.reply_text(replay, parse_mode="MarkdownV2")
+                await self.reply(update, replay, parse_mode="MarkdownV2")
                 return
             # Delete the issue via Plane API
-            success , result = self.plane_api.remove_issue(project_id, task_id)
+            success , result = await self.plane_api.remove_issue(project_id, task_id)
             if success :
+                self.issue_changed(project_id, task_id)
                 replay = success_emoji + " Task removed successfully"
-                await update.message.reply_text(replay, parse_mode="MarkdownV2")
+                await self.reply(update, replay, parse_mode="MarkdownV2")
             else:
                 error_reply = fail_emoji + " Failed to remove task, try again"
                 if self.plane_api.mode.upper() == "DEBUG":
                     error_reply += f"\nDetails : ${result}"
-                await update.message.reply_text(error_reply)
+                await self.reply(update, error_reply)
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
         except Exception as e:
+            metrics.command_errors.inc(command='removetask')
             logger.error(f"Error handling /removetask command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()} ")
             error_reply = fail_emoji + " An error occurred while removing the task, check your input and try again"
             if self.plane_api.mode.upper() == "DEBUG":
                 error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
-            await update.message.reply_text(error_reply)
+            await self.reply(update, error_reply)
+
+    @metrics.track_command('movetasks')
+    async def move_tasks(self, update: Update, context: CallbackContext):
+        try:
+            md_v2 = escape_markdown_v2
+            try:
+                state, task_ids = self.command_parser.parse_bulk(update.message.text)
+                if not state:
+                    raise CommandSyntaxError(["State is required"])
+            except CommandSyntaxError as e:
+                await self.reply(update, md_v2(format_syntax_errors(e, movetasks_format)), parse_mode="MarkdownV2")
+                return
+            if len(task_ids) > self.bulk_max_tasks:
+                replay = fail_emoji + f" Too many tasks: {len(task_ids)}, send at most {self.bulk_max_tasks} in one message"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
+                return
+            project_id = self.chat_to_project_map.get(str(update.message.chat_id))
+            if project_id is None:
+                replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
+                return
+            state_id = await self.plane_api.find_state_id(project_id, state)
+            if state_id is None:
+                await self.reply(update, md_v2(fail_emoji + " Invalid state, check /getstates and try again"), parse_mode="MarkdownV2")
+                return
+
+            results = await self.bulk_update(
+                project_id, task_ids, lambda old_task: {"state": state_id} if old_task["state"] != state_id else None
+            )
+            states_map = await self.plane_api.map_states_by_ids(project_id)
+
+            def describe(old_task, updated_task):
+                return f"~{md_v2(states_map.get(old_task['state'], '?'))}~ \u21D2 {md_v2(state)}"
+
+            await self.reply_bulk_summary(update, project_id, f"Moved to {state}", results, describe)
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
+        except Exception as e:
+            metrics.command_errors.inc(command='movetasks')
+            logger.error(f"Error handling /movetasks command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()} ")
+            error_reply = fail_emoji + " An error occurred while moving the tasks, check your input and try again"
+            if self.plane_api.mode.upper() == "DEBUG":
+                error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
+            await self.reply(update, escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
+
+    @metrics.track_command('assigntasks')
+    async def assign_tasks(self, update: Update, context: CallbackContext):
+        try:
+            md_v2 = escape_markdown_v2
+            try:
+                mentions, task_ids = self.command_parser.parse_bulk(update.message.text)
+                words = mentions.replace(",", " ").split()
+                errors = [f"'{word[:50]}' is not a @mention" for word in words if not word.startswith("@")]
+                if not words:
+                    errors.append("At least one @assignee is required")
+                if errors:
+                    raise CommandSyntaxError(errors)
+            except CommandSyntaxError as e:
+                await self.reply(update, md_v2(format_syntax_errors(e, assigntasks_format)), parse_mode="MarkdownV2")
+                return
+            if len(task_ids) > self.bulk_max_tasks:
+                replay = fail_emoji + f" Too many tasks: {len(task_ids)}, send at most {self.bulk_max_tasks} in one message"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
+                return
+            project_id = self.chat_to_project_map.get(str(update.message.chat_id))
+            if project_id is None:
+                replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
+                return
+            assignees_ids, invalid_names_list = self.find_member_ids(list(dict.fromkeys(word[1:] for word in words)))
+            if invalid_names_list:
+                replay = fail_emoji + " Can't find assignees ids :"
+                for name in invalid_names_list:
+                    replay += f"\n @{name}"
+                await self.reply(update, md_v2(replay), parse_mode="MarkdownV2")
+                return
+
+            def build_patch(old_task):
+                if all(assignee_id in old_task["assignees"] for assignee_id in assignees_ids):
+                    return None
+                return {"assignees": old_task["assignees"] + [
+                    assignee_id for assignee_id in assignees_ids if assignee_id not in old_task["assignees"]
+                ]}
+
+            def describe(old_task, updated_task):
+                added = [assignee_id for assignee_id in updated_task["assignees"] if assignee_id not in old_task["assignees"]]
+                return " ".join(f"\u2795 @{md_v2(self.members_map.get(assignee_id, assignee_id))}" for assignee_id in added)
+
+            results = await self.bulk_update(project_id, task_ids, build_patch)
+            await self.reply_bulk_summary(update, project_id, "Assigned", results, describe)
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
+        except Exception as e:
+            metrics.command_errors.inc(command='assigntasks')
+            logger.error(f"Error handling /assigntasks command: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()} ")
+            error_reply = fail_emoji + " An error occurred while assigning the tasks, check your input and try again"
+            if self.plane_api.mode.upper() == "DEBUG":
+                error_reply += f"\nError : {e} \n Error details :{traceback.format_exc()}"
+            await self.reply(update, escape_markdown_v2(error_reply), parse_mode="MarkdownV2")
+
+    async def deliver_report(self, update: Update, project_id, report):
+        """Send the /getreport pages, a failure is reported to the chat"""
+        chat_id = update.message.chat_id
+        try:
+            await self.send_report(chat_id, report, priority=PRIORITY_INTERACTIVE)
+            logger.info(f"Successfully sent report for project UUID: {project_id} to chat UUID: {chat_id}")
 
+        except Exception as e:
+            error_reply = fail_emoji + " Failed to send report"
+            if self.plane_api.mode.upper() == "DEBUG":
+                error_reply += f"\nError : {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}"
+            logger.error(f"Failed to send report to chat UUID: {chat_id} for project UUID: {project_id}. Error: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}")
+            await self.reply(update, error_reply)
+
+    @metrics.track_command('getreport')
     async def get_report(self, update: Update, context: CallbackContext):
         """Handles the /getreport command"""
         message = update.message
@@ -401,41 +964,35 @@ class PlaneNotifierBot:
             project_id = self.chat_to_project_map.get(str(update.message.chat_id))
             if project_id is None:
                 replay = fail_emoji + " Project with this chat_id is not specified in projects.json config"
-                await update.message.reply_text(replay)
+                await self.reply(update, replay)
                 return
 
-            # 2. Fetch Project Details and Tasks
-            project_details = self.plane_api.get_project(project_id)
+            # 2. Take the report from the cache, or fetch and render it, shared with concurrent requests
+            _, arguments = self.command_parser.split_command(message.text)
+            fresh = arguments.strip().lower() == "fresh"
+            project_details, categorized_tasks, report = await self.cached_report(project_id, fresh=fresh)
             if not project_details:
-                await update.message.reply_text(f"No details found for project UUID: {project_id}")
+                await self.reply(update, f"No details found for project UUID: {project_id}")
                 return
-
-            categorized_tasks = self.plane_api.get_tasks_by_status_for_project(project_id)
             if not categorized_tasks:
-                await update.message.reply_text(f"No tasks found for project UUID: {project_id}")
+                await self.reply(update, f"No tasks found for project UUID: {project_id}")
                 return
 
-            # 3. Generate Report
-            report = self.plane_api.generate_report_for_project(project_id, project_details, categorized_tasks)
-
-            # 4. Send Report
-            try:
-                await self.bot.send_message(chat_id=chat_id, text=report, parse_mode="MarkdownV2")
-                logger.info(f"Successfully sent report for project UUID: {project_id} to chat UUID: {chat_id}")
-
-            except Exception as e:
-                error_reply = fail_emoji + " Failed to send report"
-                if self.plane_api.mode.upper() == "DEBUG":
-                    error_reply += f"\nError : {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}"
-                logger.error(f"Failed to send report to chat UUID: {chat_id} for project UUID: {project_id}. Error: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}")
-                await update.message.reply_text(error_reply)
+            # 3. Send Report, pages go out at the chat's rate limit, the handler doesn't wait for them
+            self.run_in_background(
+                self.deliver_report(update, project_id, report),
+                f"Delivery of report for project UUID: {project_id} to chat UUID: {chat_id}"
+            )
 
+        except PlaneUnavailable as e:
+            await self.reply(update, escape_markdown_v2(f"{fail_emoji} {e}"), parse_mode="MarkdownV2")
         except Exception as e:
             error_reply = fail_emoji + " An unexpected error occurred "
             if self.plane_api.mode.upper() == "DEBUG":
                 error_reply += f"\nError : {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}"
+            metrics.command_errors.inc(command='getreport')
             logger.error(f"Error processing /getreport command for chat UUID: {chat_id}. Error: {e} \nCause : {e.__cause__} \n Traceback:{traceback.format_exc()}")
-            await update.message.reply_text(error_reply)  # Generic error message
+            await self.reply(update, error_reply)  # Generic error message
 
     async def run(self):
         logger.info("Starting PlaneNotifierBot...")
@@ -446,26 +1003,141 @@ class PlaneNotifierBot:
                 timezone=self.timezone
             )
             scheduler.add_job(
-                func=self.send_report_to_chats,
+                func=self.send_report_to_chats if self.cluster is None else self.send_cluster_reports,
                 trigger=cronTrigger,
                 misfire_grace_time=30
             )
+            if self.cluster is not None:
+                self.cluster.heartbeat()
+                scheduler.add_job(
+                    func=self.cluster_heartbeat,
+                    trigger=IntervalTrigger(seconds=self.cluster.heartbeat_interval),
+                    max_instances=1,
+                    coalesce=True
+                )
+            if self.mirror is not None:
+                scheduler.add_job(
+                    func=self.sync_mirror,
+                    trigger=IntervalTrigger(seconds=self.mirror_sync_interval),
+                    next_run_time=datetime.datetime.now(),
+                    max_instances=1,
+                    coalesce=True
+                )
+            if self.mappings.reload_interval:
+                scheduler.add_job(
+                    func=self.mappings.reload_if_changed,
+                    trigger=IntervalTrigger(seconds=self.mappings.reload_interval),
+                    max_instances=1,
+                    coalesce=True
+                )
             scheduler.start()
 
+            await self.dispatcher.start()
             await self.application.initialize()
             await self.application.start()
-            await self.application.updater.start_polling()
+            if self.telegram_delivery == "webhook":
+                await self.start_webhook()
+            elif self.cluster is None:
+                await self.application.updater.start_polling()
+            else:
+                await self.cluster_heartbeat()
+            for server in self.http_servers.values():
+                await server.start()
+            self.warmup_task = asyncio.create_task(self.warmup())
             await self.stop_event.wait()
         except KeyboardInterrupt:
             self.stop_event.set()
             logger.info("PlaneNotifierBot stopped by user")
         finally:
             self.stop_event.set()
-            await self.application.updater.stop()
+            self.ready = False
+            if self.warmup_task is not None:
+                self.warmup_task.cancel()
+            for server in self.http_servers.values():
+                await server.stop()
+            if self.application.updater.running:
+                await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
+            await self.dispatcher.stop()
+            await self.plane_api.close()
+            if self.mirror is not None:
+                self.mirror.close()
+            if self.cluster is not None:
+                self.cluster.leave()
+                self.cluster.close()
             logger.info("PlaneNotifierBot stopped")
 
+    def add_http_route(self, host, port, method, path, handler):
+        """Register an endpoint on the local HTTP server for host:port, endpoints on the same port share a server"""
+        server = self.http_servers.setdefault((host, port), HttpServer(host, port))
+        server.add_route(method, path, handler)
+
+    async def warmup(self):
+        """
+        Fill states and report caches of every mapped project concurrently, at most report_concurrency at a time.
+        In worker mode only the projects this worker owns on the hash ring are warmed.
+
+        Projects not warmed within warmup_timeout are left to the first command or scheduled run,
+        the bot is reported ready either way.
+        """
+        project_ids = list(self.project_to_chat_map)
+        if self.cluster is not None:
+            project_ids = [project_id for project_id in project_ids if self.cluster.owns(project_id)]
+        semaphore = asyncio.Semaphore(self.report_concurrency)
+        warmed = []
+
+        async def warm(project_id):
+            async with semaphore:
+                try:
+                    project_details, categorized_tasks = await self.fetch_report_data(project_id)
+                    if project_details:
+                        warmed.append(project_id)
+                except Exception as e:
+                    logger.warning(f"Warmup of project UUID: {project_id} failed: {e}")
+
+        started_at = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(warm(project_id) for project_id in project_ids)),
+                timeout=self.warmup_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Warmup deadline of {self.warmup_timeout}s passed, continuing with cold caches")
+        self.ready = True
+        logger.info(f"Warmed {len(warmed)} of {len(project_ids)} projects in {time.monotonic() - started_at:.1f}s, "
+                    f"PlaneNotifierBot is ready")
+
+    async def handle_ready(self, request: HttpRequest):
+        """Readiness probe, 503 until the bot handles updates and the warmup is done or its deadline passed"""
+        if self.ready and self.application.running:
+            return HttpResponse(status=HTTPStatus.OK, body=b"ready")
+        return HttpResponse(status=HTTPStatus.SERVICE_UNAVAILABLE, body=b"warming up")
+
+    async def start_webhook(self):
+        if self.webhook_url:
+            await self.application.bot.set_webhook(
+                url=self.webhook_url,
+                secret_token=self.webhook_secret_token,
+                allowed_updates=Update.ALL_TYPES
+            )
+            logger.info(f"Telegram webhook registered at {self.webhook_url}")
+        else:
+            logger.warning("webhook_url is not set, Telegram webhook must be registered separately")
+
+    async def handle_telegram_webhook(self, request: HttpRequest):
+        """Receives updates pushed by Telegram and queues them for the application handlers"""
+        if not hmac.compare_digest(
+                request.headers.get("x-telegram-bot-api-secret-token", ""), self.webhook_secret_token):
+            logger.warning("Telegram webhook request with invalid secret token rejected")
+            return HttpResponse(status=HTTPStatus.FORBIDDEN)
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+        await self.application.update_queue.put(Update.de_json(data, self.application.bot))
+        return HttpResponse(status=HTTPStatus.OK)
+
     async def periodic_task(self):
         logger.info("Starting periodic report generation...")
         await self.send_report_to_chats()
@@ -484,13 +1156,13 @@ class PlaneNotifierBot:
             "timezone": timezone
         }
 
-    def construct_update_replay(self, updated_task, old_task, project_id):
+    async def construct_update_replay(self, updated_task, old_task, project_id):
         md_v2 = escape_markdown_v2
         task_link = f"{self.plane_api.base_url}{self.plane_api.workspace_slug}/projects/{project_id}/issues/{updated_task['id']}"
         replay = (
                 success_emoji +
-                f" Task updated successfully:\n[{md_v2(updated_task['name'])}]({md_v2(task_link)})\n"
-                f"UUID: `{md_v2(updated_task['id'])}`\n"
+                f" Task updated successfully:\n{link(updated_task['name'], task_link)}\n"
+                f"UUID: {code(updated_task['id'])}\n"
         )
         if old_task['name'] != updated_task['name']:
             replay += f"Title: ~{md_v2(old_task['name'])}~ \u21D2 {md_v2(updated_task['name'])}\n"
@@ -524,7 +1196,7 @@ class PlaneNotifierBot:
             replay += f"Priority: {md_v2(updated_task['priority'])}\n"
         if old_task['priority'] != "none" and old_task['priority'] != updated_task['priority']:
             replay += f"Priority: ~{md_v2(old_task['priority'])}~ \u21D2 {md_v2(updated_task['priority'])}\n"
-        states_map = self.plane_api.map_states_by_ids(project_id)
+        states_map = await self.plane_api.map_states_by_ids(project_id)
         if states_map.get(old_task['state']) != states_map.get(updated_task['state']):
             replay += (
                 f"State: ~{md_v2(states_map.get(old_task['state']))}~"
@@ -537,15 +1209,15 @@ class PlaneNotifierBot:
             replay += f" \u2795 @{md_v2(self.members_map.get(assignee_id))}\n"
         return replay
 
-    def construct_new_replay(self, new_task, project_id):
+    async def construct_new_replay(self, new_task, project_id):
         md_v2 = escape_markdown_v2
         task_link = f"{self.plane_api.base_url}{self.plane_api.workspace_slug}/projects/{project_id}/issues/{new_task['id']}"
 
         # Constructing replay
         replay = (
                 success_emoji +
-                f' Task created successfully:\n[{md_v2(new_task.get("name"))}]({md_v2(task_link)})\n'
-                f'UUID: `{md_v2(new_task.get("id"))}`\n'
+                f' Task created successfully:\n{link(new_task.get("name"), task_link)}\n'
+                f'UUID: {code(new_task.get("id"))}\n'
                 f'Title: {md_v2(new_task.get("name"))}\n'
         )
 
@@ -558,7 +1230,7 @@ class PlaneNotifierBot:
             replay += f"Deadline: {md_v2(new_task.get('target_date'))}\n"
         if new_task['priority'] != "none":
             replay += f"Priority: {md_v2(new_task.get('priority'))}\n"
-        states_map = self.plane_api.map_states_by_ids(project_id)
+        states_map = await self.plane_api.map_states_by_ids(project_id)
         if states_map.get(new_task.get('state')):
             replay += f"State: {md_v2(states_map.get(new_task.get('state')))}\n"
         if new_task["assignees"]:
@@ -566,68 +1238,3 @@ class PlaneNotifierBot:
         for assignee_id in new_task.get("assignees"):
             replay += f" @{md_v2(self.members_map.get(assignee_id))}\n"
         return replay
-
-    def parse_newtask_message(self, message):
-        patterns = {
-            'title': re.compile(r'Title\s*:\s*(.*?)[\s,]*(?=\s*(?:Description[\s,]*:|Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))', re.DOTALL),
-            'description': re.compile(r'Description\s*:\s*(.*?)[\s,]*(?=\s*(?:Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))', re.DOTALL),
-            'start': re.compile(r'Start\s*:\s*(\S*)[\s,]*'),
-            'deadline': re.compile(r'Deadline\s*:\s*(\S*)[\s,]*'),
-            'priority': re.compile(r'Priority\s*:\s*(.*?)[\s,]*'),
-            'state': re.compile(r'State\s*:\s*(.*?)(?=\n|$|@)[\s,]*'),
-            'assignees': re.compile(r'(?:^|\s)(@\w+)')
-        }
-
-        parsed_data = {}
-
-        for field, pattern in patterns.items():
-            match = pattern.search(message)
-            if match:
-                if field in ['title', 'description', 'state']:
-                    parsed_data[field] = match.group(1).strip()
-                elif field == 'assignees':
-                    matches = pattern.findall(message)
-                    if matches:
-                        parsed_data[field] = list(set(
-                            name.strip().rstrip(',.!')  # Чистим ник от мусора
-                            for name in matches
-                        ))
-                else:
-                    parsed_data[field] = match.group(1).strip()
-
-        # Валидация данных
-
-        return parsed_data
-
-    def parse_updatetask_message(self, message):
-        patterns = {
-            'id' : re.compile(r'\s*UUID\s*:\s*(\S*)[\s,]*'),
-            'title': re.compile(r'Title\s*:\s*(.*?)[\s,]*(?=\s*(?:Description[\s,]*:|Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))', re.DOTALL),
-            'description': re.compile(r'Description\s*:\s*(.*?)[\s,]*(?=\s*(?:Start[\s,]*:|Deadline[\s,]*:|Priority[\s,]*:|State[\s,]*:|@|\Z))', re.DOTALL),
-            'start': re.compile(r'Start\s*:\s*(\S*)[\s,]*'),
-            'deadline': re.compile(r'Deadline\s*:\s*(\S*)[\s,]*'),
-            'priority': re.compile(r'Priority\s*:\s*(.*?)[\s,]*'),
-            'state': re.compile(r'State\s*:\s*(.*?)(?=\n|$|@)[\s,]*'),
-            'assignees': re.compile(r'(?:^|\s)(@\w+)')
-        }
-
-        parsed_data = {}
-
-        for field, pattern in patterns.items():
-            match = pattern.search(message)
-            if match:
-                if field in ['title', 'description', 'state']:
-                    parsed_data[field] = match.group(1).strip()
-                elif field == 'assignees':
-                    matches = pattern.findall(message)
-                    if matches:
-                        parsed_data[field] = list(set(
-                            name.strip().rstrip(',.!')  # Чистим ник от мусора
-                            for name in matches
-                        ))
-                else:
-                    parsed_data[field] = match.group(1).strip()
-
-        # Валидация данных
-
-        return parsed_data
\ No newline at end of file
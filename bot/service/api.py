@@ -1,27 +1,140 @@
-import json
+import asyncio
+import logging
 
-import requests
+import httpx
 
-from bot.utils.logger_config import logger
-from bot.utils.utils import escape_markdown_v2
+from bot.service import metrics
+from bot.service.resilience import circuit_breaker, backoff_delay, retry_after_delay
+from bot.utils.cache import TTLCache, SingleFlight, single_flight
+from bot.utils.logger_config import logger, log_response
+from bot.utils.markdown import escape_markdown_v2, escape_url, link
+from bot.utils.utils import paginate_report
 
 
 class PlaneAPI:
-    def __init__(self, api_token, workspace_slug, config, member_map, base_url='https://api.plane.so/', mode='debug'):
+    # Issue fields used by reports and report snapshots, nothing else is requested for reports
+    REPORT_FIELDS = ("id", "name", "state", "assignees", "updated_at")
+    # Responses worth retrying, GET requests only, other methods may have been applied already
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, api_token, workspace_slug, config, mappings, base_url='https://api.plane.so/', mode='debug'):
         self.mode = mode
         self.api_token = api_token
         self.workspace_slug = workspace_slug
-        self.member_map = member_map
+        self.mappings = mappings
         self.config = config
         self.base_url = base_url
         self.base_api_url = base_url + 'api/v1/'
         self.headers = {'X-API-Key': self.api_token}
+        self.issues_page_size = config.get("issues_page_size", 100)
+        self.report_max_length = config.get("report_max_message_length", 4096)
+        # project_id -> (state id -> name, state name -> id)
+        self.states_cache = TTLCache(
+            maxsize=config.get("states_cache_size", 128),
+            ttl=config.get("states_cache_ttl", 300),
+        )
+        # Identical reads in flight at the same time, e.g. /getreport typed by several people, share one request
+        self.inflight = SingleFlight()
+        # Read timeouts per request endpoint label, e.g. {"issues": 60, "create": 15}, plane_timeout for the rest
+        connect_timeout = config.get("plane_connect_timeout", 5)
+        self.endpoint_timeouts = {
+            endpoint: httpx.Timeout(timeout, connect=connect_timeout)
+            for endpoint, timeout in (config.get("plane_endpoint_timeouts") or {}).items()
+        }
+        self.retries = config.get("plane_retries", 3)
+        self.retry_backoff = config.get("plane_retry_backoff", 0.5)
+        self.retry_max_backoff = config.get("plane_retry_max_backoff", 10)
+        self.breaker = circuit_breaker(
+            base_url,
+            failure_threshold=config.get("plane_breaker_failures", 5),
+            reset_timeout=config.get("plane_breaker_reset_timeout", 30),
+        )
+        # Single pooled client shared by every call, keeps connections to Plane alive between requests
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_connections=config.get("plane_max_connections", 20),
+                max_keepalive_connections=config.get("plane_max_keepalive_connections", 10),
+                keepalive_expiry=config.get("plane_keepalive_expiry", 30),
+            ),
+            timeout=httpx.Timeout(config.get("plane_timeout", 30), connect=connect_timeout),
+        )
+
+    @property
+    def member_map(self):
+        # Read on every use, mappings may be reloaded while the bot runs
+        return self.mappings.current.members
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def request(self, endpoint, method, url, **kwargs):
+        """
+        Perform a Plane API request, recording its latency and errors per endpoint.
+
+        GET requests failed with a connection error, a timeout, 429 or 5xx are retried with jittered
+        exponential backoff, honoring Retry-After. Every request goes through the circuit breaker of
+        the Plane server.
+
+        Args:
+            endpoint (str): Metrics and timeouts label, e.g. 'issues' or 'create'.
+            method (str): HTTP method.
+            url (str): Request URL.
+            **kwargs: Passed to httpx.AsyncClient.request.
+
+        Returns:
+            httpx.Response: The response.
+
+        Raises:
+            PlaneUnavailable: If the circuit breaker is open.
+        """
+        if endpoint in self.endpoint_timeouts:
+            kwargs.setdefault("timeout", self.endpoint_timeouts[endpoint])
+        attempts = 1 + self.retries if method == "GET" else 1
+        for attempt in range(attempts):
+            self.breaker.before_request()
+            last_attempt = attempt + 1 == attempts
+            with metrics.plane_request_seconds.time(endpoint=endpoint, method=method):
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    # Connection errors and timeouts, Plane may be down
+                    metrics.plane_request_errors.inc(endpoint=endpoint, method=method)
+                    self.breaker.record_failure()
+                    if last_attempt or self.breaker.is_open:
+                        raise
+                    response, error = None, repr(e)
+                except httpx.HTTPError:
+                    metrics.plane_request_errors.inc(endpoint=endpoint, method=method)
+                    raise
+            if response is not None:
+                if response.status_code >= 400:
+                    metrics.plane_request_errors.inc(endpoint=endpoint, method=method)
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if last_attempt or response.status_code not in self.RETRY_STATUSES or self.breaker.is_open:
+                    return response
+                error = f"status {response.status_code}"
+            delay = retry_after_delay(response) if response is not None else None
+            if delay is None:
+                delay = backoff_delay(attempt, self.retry_backoff, self.retry_max_backoff)
+            elif delay > self.retry_max_backoff:
+                # Waiting longer would hold the command, the caller gets the response instead
+                return response
+            logger.warning(f"Plane {method} {endpoint} failed: {error}, retry {attempt + 1} in {delay:.2f}s")
+            metrics.plane_request_retries.inc(endpoint=endpoint)
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
 
-    def get_all_projects(self):
+    @single_flight
+    async def get_all_projects(self):
         logger.info("Getting all projects")
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/'
-        response = requests.get(url, headers=self.headers)
-        logger.debug(json.dumps(response.text, indent=4, ensure_ascii=False))
+        response = await self.request("projects", "GET", url)
+        log_response(response)
         if response.status_code == 200:
             projects = response.json()
             return [self.map_project(project) for project in projects.get("results", [])]
@@ -29,10 +142,11 @@ class PlaneAPI:
             logger.error(f"Error fetching projects: {response.status_code}, {response.text}")
             return None
 
-    def get_project(self, project_id):
+    @single_flight
+    async def get_project(self, project_id):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/'
-        response = requests.get(url, headers=self.headers)
-        logger.debug(json.dumps(response.text, indent=4, ensure_ascii=False))
+        response = await self.request("projects", "GET", url)
+        log_response(response)
         if response.status_code == 200:
             logger.info(f"Successfully received project{project_id}.")
             project = response.json()
@@ -41,21 +155,42 @@ class PlaneAPI:
             logger.error(f"Error fetching project: {response.status_code}, {response.text}")
             return None
 
-    def get_project_tasks(self, project_id):
+    async def iter_project_tasks(self, project_id, params=None):
+        """
+        Stream issues of a project, following Plane cursor pagination page by page.
+
+        Only one page is held in memory at a time, its size is taken from `issues_page_size` config.
+
+        Args:
+            project_id (str): The ID of the project to process.
+            params (dict): Extra query parameters for the issues endpoint.
+
+        Yields:
+            dict: Issue data.
+        """
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/issues/'
-        response = requests.get(url, headers=self.headers)
-        logger.debug(json.dumps(response.text, indent=4, ensure_ascii=False))
-        if response.status_code == 200:
-            logger.info(f"Successfully received tasks for project{project_id}.")
-            return response.json()
-        else:
-            logger.error(f"Error fetching tasks for project {project_id}: {response.status_code}")
-            return None
+        query = {"per_page": self.issues_page_size, **(params or {})}
+        while True:
+            response = await self.request("issues", "GET", url, params=query)
+            log_response(response)
+            if response.status_code != 200:
+                logger.error(f"Error fetching tasks for project {project_id}: {response.status_code}")
+                # Fail loudly, a partially fetched project must not look like a complete one
+                response.raise_for_status()
+            page = response.json()
+            for task in page.get("results", []):
+                yield task
+            next_cursor = page.get("next_cursor")
+            if not page.get("next_page_results") or not next_cursor:
+                break
+            query["cursor"] = next_cursor
+        logger.info(f"Successfully received tasks for project{project_id}.")
 
-    def get_task_by_uuid(self, project_id, issue_id):
+    @single_flight
+    async def get_task_by_uuid(self, project_id, issue_id):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/issues/{issue_id}'
-        response = requests.get(url, headers=self.headers)
-        logger.debug(json.dumps(response.text, indent=4, ensure_ascii=False))
+        response = await self.request("issues", "GET", url)
+        log_response(response)
         if response.status_code == 200:
             logger.info(f"Successfully received issue{issue_id}.")
             return response.json()
@@ -63,10 +198,11 @@ class PlaneAPI:
             logger.error(f"Error fetching task from project {project_id}: {response.status_code}")
             return None
 
-    def get_task_states_ids(self, project_id):
+    @single_flight
+    async def get_task_states_ids(self, project_id):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/states/'
-        response = requests.get(url, headers=self.headers)
-        logger.debug(json.dumps(response.text, indent=4, ensure_ascii=False))
+        response = await self.request("states", "GET", url)
+        log_response(response)
         if response.status_code == 200:
             logger.info(f"Successfully received states{project_id}.")
             return response.json()
@@ -74,7 +210,12 @@ class PlaneAPI:
             logger.error(f"Error fetching task statuses for project {project_id}: {response.status_code}")
             return None
 
-    def get_tasks_by_status_for_project(self, project_id):
+    def forget_inflight_tasks(self, project_id):
+        """Issues of the project changed, reads started before the change are not shared with later callers"""
+        self.inflight.forget(("get_tasks_by_status_for_project", project_id))
+
+    @single_flight
+    async def get_tasks_by_status_for_project(self, project_id):
         """
         Fetch tasks by statuses ('Todo', 'In Progress', 'In Review') for a specific project.
 
@@ -86,11 +227,10 @@ class PlaneAPI:
         """
         states_list = self.config["report_states_list"]
         # Fetch project states
-        project_states_map = self.map_states_by_ids(project_id)
+        project_states_map, inv_project_states_map = await self.get_states_maps(project_id)
         if not project_states_map:
             logger.warning(f"No statuses found for project ID: {project_id}")
             return
-        inv_project_states_map = {v: k for k, v in project_states_map.items()}
 
         # Task states filter
         report_states_map = {inv_project_states_map[item]: item for item in inv_project_states_map.keys() if
@@ -98,16 +238,22 @@ class PlaneAPI:
         if not report_states_map:
             logger.warning(f"No relevant statuses found for project ID: {project_id}")
             return
-        # Fetch all tasks for the project
-        tasks_data = self.get_project_tasks(project_id)
-        if not tasks_data or "results" not in tasks_data:
-            logger.warning(f"No tasks found for project ID: {project_id}")
-            return
-        # Construct categorized tasks
-        result = {
-            state_name: [task for task in tasks_data["results"] if task["state"] == state_id] for state_id, state_name
-            in report_states_map.items()
+        # Ask Plane only for issues in reported states and only for fields used in the report
+        params = {
+            "state": ",".join(report_states_map.keys()),
+            "fields": ",".join(self.REPORT_FIELDS),
         }
+        # Stream tasks for the project and categorize them page by page
+        result = {state_name: [] for state_name in report_states_map.values()}
+        try:
+            async for task in self.iter_project_tasks(project_id, params=params):
+                # Filters are re-applied locally in case the server ignores them
+                state_name = report_states_map.get(task["state"])
+                if state_name is not None:
+                    result[state_name].append({field: task.get(field) for field in self.REPORT_FIELDS})
+        except httpx.HTTPError as e:
+            logger.warning(f"No tasks found for project ID: {project_id}, error: {e}")
+            return
 
         return result
 
@@ -122,47 +268,102 @@ class PlaneAPI:
             project_id (str): The ID of the project to process.
 
         Returns:
-            str: A formatted report string for Telegram.
+            list[str]: Formatted report messages for Telegram, split to fit the message length limit.
         """
         md_v2 = escape_markdown_v2
         # Fetch tasks by status
         if not categorized_tasks:
-            return f"No tasks found or failed to generate report for project ID: {project_id}"
+            return [md_v2(f"No tasks found or failed to generate report for project ID: {project_id}")]
 
-        # Define the base URL for links
-        project_base_url = f"{self.base_url}{self.workspace_slug}/projects/{project_id}/issues/"
-        report = [f"📍*Project: {md_v2(project_details['name'])}*\n"]
+        # Everything repeated across tasks is escaped once per report
+        task_url = escape_url(f"{self.base_url}{self.workspace_slug}/projects/{project_id}/issues/")
+        mentions = {}
+
+        def mention(user_id):
+            if user_id not in mentions:
+                mentions[user_id] = escape_markdown_v2('@' + self.member_map.get(user_id, user_id))
+            return mentions[user_id]
+
+        header = f"📍*Project: {md_v2(project_details['name'])}*\n"
+        sections = []
         # Generate report for each status
         for status, tasks in categorized_tasks.items():
-            report.append(f"*{md_v2(status)}*:")
-            if not tasks:
-                report.append("_No tasks_\n")
-                continue
-
+            entries = []
             for task in tasks:
-                task_link = f"{project_base_url}{(task['id'])}"
-                unique_assignees = set(task.get("assignees", []))
-                assignees = ", ".join(
-                    ['@' + self.member_map.get(user_id) for user_id in unique_assignees]
-                )
-                report.append(
-                    f"• [{md_v2(task['name'])}]({md_v2(task_link)}) "
-                    f" `{(task['id'])}`\n"
-                    f"  └ Assigned to: {md_v2(assignees) if assignees else '_Unassigned_'}"
+                task_id = task['id']
+                assignees = ", ".join(mention(user_id) for user_id in dict.fromkeys(task.get("assignees", [])))
+                entries.append(
+                    f"• [{md_v2(task['name'])}]({task_url}{escape_url(task_id)}) "
+                    f" `{task_id}`\n"
+                    f"  └ Assigned to: {assignees or '_Unassigned_'}"
                 )
-            report.append("")
+            sections.append((f"*{md_v2(status)}*:", entries or ["_No tasks_"]))
+
+        report = paginate_report(header, sections, self.report_max_length)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n".join(report))
+        return report
+
+    def generate_changes_report_for_project(self, project_id, project_details, previous, snapshot, changes):
+        """
+        Generate a compact report listing only tasks added, moved, updated or removed since the previous report.
+
+        Args:
+            project_id (str): The ID of the project to process.
+            project_details (dict): details about the project.
+            previous (dict): Snapshot of the previously sent report.
+            snapshot (dict): Snapshot of the current tasks.
+            changes (dict): Result of ReportSnapshotStore.diff for these snapshots.
+
+        Returns:
+            list[str]: Formatted report messages for Telegram, empty if nothing visible changed.
+        """
+        md_v2 = escape_markdown_v2
+        project_base_url = f"{self.base_url}{self.workspace_slug}/projects/{project_id}/issues/"
+
+        def task_line(task_id, task):
+            return f"• {link(task['name'], project_base_url + task_id)}"
 
-        logger.debug("\n".join(report))
-        return "\n".join(report)
+        def assignees_line(task):
+            assignees = ", ".join('@' + self.member_map.get(user_id, user_id) for user_id in task["assignees"])
+            return f"  └ Assigned to: {md_v2(assignees) if assignees else '_Unassigned_'}"
 
-    def create_issue(self, project_id, issue_data):
+        sections = []
+        if changes["added"]:
+            sections.append(("*Added*:", [
+                f"{task_line(task_id, snapshot[task_id])} \u21D2 {md_v2(snapshot[task_id]['status'])}\n"
+                f"{assignees_line(snapshot[task_id])}"
+                for task_id in changes["added"]
+            ]))
+        if changes["moved"]:
+            sections.append(("*Moved*:", [
+                f"{task_line(task_id, snapshot[task_id])}: "
+                f"~{md_v2(previous[task_id]['status'])}~ \u21D2 {md_v2(snapshot[task_id]['status'])}"
+                for task_id in changes["moved"]
+            ]))
+        if changes["updated"]:
+            sections.append(("*Updated*:", [
+                f"{task_line(task_id, snapshot[task_id])}\n{assignees_line(snapshot[task_id])}"
+                for task_id in changes["updated"]
+            ]))
+        if changes["removed"]:
+            sections.append(("*Removed from report*:", [
+                f"• ~{md_v2(previous[task_id]['name'])}~ `{task_id}`"
+                for task_id in changes["removed"]
+            ]))
+        if not sections:
+            return []
+
+        header = f"📍*Project: {md_v2(project_details['name'])}* \\- changes\n"
+        report = paginate_report(header, sections, self.report_max_length)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("\n".join(report))
+        return report
+
+    async def create_issue(self, project_id, issue_data):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/issues/'
         try:
-            response = requests.post(
-                url,
-                headers={**self.headers, "Content-Type": "application/json"},
-                data=json.dumps(issue_data)
-            )
+            response = await self.request("create", "POST", url, json=issue_data)
             logger.debug(f"Creating issue in project {project_id}, response : {response}")
             if response.status_code == 201:
                 logger.info(f"Issue created successfully in project {project_id}.")
@@ -174,16 +375,13 @@ class PlaneAPI:
                 }
                 logger.error(f"Error creating issue in project {project_id}: {response.status_code}, {response.text}")
                 return False, error_details
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return False, {"error_message": str(e)}
 
-    def remove_issue(self, project_id, issue_id):
+    async def remove_issue(self, project_id, issue_id):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/issues/{issue_id}'
         try:
-            response = requests.delete(
-                url,
-                headers={**self.headers, "Content-Type": "application/json"},
-            )
+            response = await self.request("delete", "DELETE", url)
             logger.debug(f"Removing issue {issue_id} in project {project_id}, response : {response}")
             if response.status_code == 204:
                 logger.info(f"Issue {issue_id} removed successfully in project {project_id}.")
@@ -195,17 +393,13 @@ class PlaneAPI:
                 }
                 logger.error(f"Error removing issue {issue_id} in project {project_id}: {response.status_code}, {response.text}")
                 return False, error_details
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return False, {"error_message": str(e)}
 
-    def update_issue(self, project_id, issue_id, update_issue_data):
+    async def update_issue(self, project_id, issue_id, update_issue_data):
         url = f'{self.base_api_url}workspaces/{self.workspace_slug}/projects/{project_id}/issues/{issue_id}/'
         try:
-            response = requests.patch(
-                url,
-                headers={**self.headers, "Content-Type": "application/json"},
-                data=json.dumps(update_issue_data)
-            )
+            response = await self.request("update", "PATCH", url, json=update_issue_data)
             logger.debug(f"Updating issue {issue_id} in project {project_id}, response : {response}")
             if response.status_code == 200:
                 logger.info(f"Issue {issue_id} updated successfully in project {project_id}.")
@@ -217,15 +411,56 @@ class PlaneAPI:
                 }
                 logger.error(f"Error updating issue {issue_id} in project {project_id}: {response.status_code}, {response.text}")
                 return False, error_details
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return False, {"error_message": str(e)}
 
-    def map_states_by_ids(self, project_id):
-        states = self.get_task_states_ids(project_id)
-        mapped_statutes = {
-            data["id"]: data["name"] for data in states["results"]
-        }
-        return mapped_statutes
+    async def get_states_maps(self, project_id):
+        """
+        Get cached forward and inverse state maps of a project, fetching states on a cache miss.
+
+        Args:
+            project_id (str): The ID of the project to process.
+
+        Returns:
+            tuple: (state id -> state name, state name -> state id), both empty if states can't be fetched.
+        """
+        states_maps = self.states_cache.get(project_id)
+        if states_maps is None:
+            states = await self.get_task_states_ids(project_id)
+            if not states:
+                return {}, {}
+            states_map = {data["id"]: data["name"] for data in states["results"]}
+            states_maps = (states_map, {v: k for k, v in states_map.items()})
+            self.states_cache.set(project_id, states_maps)
+        return states_maps
+
+    async def map_states_by_ids(self, project_id):
+        states_map, _ = await self.get_states_maps(project_id)
+        return states_map
+
+    async def map_states_by_names(self, project_id):
+        _, inv_states_map = await self.get_states_maps(project_id)
+        return inv_states_map
+
+    async def find_state_id(self, project_id, state_name):
+        """Resolve a state name to its id, refreshing cached states once if the name is unknown."""
+        inv_states_map = await self.map_states_by_names(project_id)
+        if state_name not in inv_states_map:
+            self.invalidate_states(project_id)
+            inv_states_map = await self.map_states_by_names(project_id)
+        return inv_states_map.get(state_name)
+
+    async def find_state_ids(self, project_id, state_names):
+        """Resolve many state names at once, unknown names map to None. Cached states are refreshed at most once."""
+        inv_states_map = await self.map_states_by_names(project_id)
+        if any(name not in inv_states_map for name in state_names):
+            self.invalidate_states(project_id)
+            inv_states_map = await self.map_states_by_names(project_id)
+        return {name: inv_states_map.get(name) for name in state_names}
+
+    def invalidate_states(self, project_id=None):
+        """Drop cached states of a project, or of every project when project_id is None."""
+        self.states_cache.invalidate(project_id)
 
     @staticmethod
     def map_project_members(project_details):
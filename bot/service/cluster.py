@@ -0,0 +1,209 @@
+import bisect
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+
+from bot.utils.logger_config import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_claims (
+    project_id TEXT NOT NULL,
+    tick TEXT NOT NULL,
+    worker_id TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    PRIMARY KEY (project_id, tick)
+);
+CREATE TABLE IF NOT EXISTS store (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+# Report claims are only needed for the run in progress, older ones are dropped by the leader
+CLAIMS_RETENTION = 24 * 3600
+
+
+class HashRing:
+    """
+    Consistent hash ring, maps keys to nodes so that adding or removing a node moves only its share of keys.
+
+    Args:
+        nodes (list[str]): Node names.
+        vnodes (int): Points per node on the ring, more points spread keys more evenly.
+    """
+
+    def __init__(self, nodes, vnodes=100):
+        self.nodes = sorted(set(nodes))
+        points = sorted((self._hash(f"{node}#{index}"), node) for node in self.nodes for index in range(vnodes))
+        self.hashes = [point for point, _ in points]
+        self.owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def owner(self, key):
+        """Node owning the key, None for an empty ring"""
+        if not self.owners:
+            return None
+        index = bisect.bisect(self.hashes, self._hash(key)) % len(self.hashes)
+        return self.owners[index]
+
+
+class SharedStore:
+    """
+    Dictionary kept in the cluster SQLite file, same interface as JsonFileStore.
+
+    Nothing is cached in memory, every read sees what any worker wrote last, so state like report snapshots
+    follows a project when it moves to another worker.
+
+    Args:
+        db (sqlite3.Connection): Cluster database in autocommit mode.
+        namespace (str): Keeps stores sharing the table apart.
+    """
+
+    def __init__(self, db, namespace):
+        self.db = db
+        self.namespace = namespace
+
+    def get(self, key, default=None):
+        row = self.db.execute(
+            "SELECT value FROM store WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        self.db.execute(
+            "INSERT INTO store (namespace, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+            (self.namespace, key, json.dumps(value, ensure_ascii=False))
+        )
+
+    async def update(self, items):
+        """Set several keys in one transaction"""
+        self.db.execute("BEGIN")
+        try:
+            self.db.executemany(
+                "INSERT INTO store (namespace, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+                [(self.namespace, key, json.dumps(value, ensure_ascii=False)) for key, value in items.items()]
+            )
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        self.db.execute("DELETE FROM store WHERE namespace = ? AND key = ?", (self.namespace, key))
+        return value
+
+
+class ClusterCoordinator:
+    """
+    Coordinates bot replicas through a shared SQLite file: worker membership, a cron leader lease
+    and per-run report claims.
+
+    Every worker heartbeats its row in `workers`, live workers form a consistent hash ring and each one
+    reports only the projects it owns. A project report is sent only after its (project, cron tick) claim
+    is inserted, so a report goes out once even while workers disagree about the ring. The leader holds
+    a renewable lease, polls Telegram updates (only one getUpdates consumer is allowed per bot) and, after
+    the lease TTL, reports projects of the tick nobody claimed, e.g. because their owner died mid-run.
+
+    Args:
+        config (dict): Bot config.
+    """
+
+    LEADER_LEASE = "cron"
+
+    def __init__(self, config):
+        self.worker_id = config.get("cluster_worker_id") or f"{socket.gethostname()}-{os.getpid()}"
+        self.heartbeat_interval = config.get("cluster_heartbeat_interval", 5)
+        self.lease_ttl = config.get("cluster_lease_ttl", 15)
+        self.vnodes = config.get("cluster_vnodes", 100)
+        self.db = sqlite3.connect(config.get("cluster_path", "cluster.sqlite3"), timeout=5, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.is_leader = False
+        self.ring = HashRing([self.worker_id], self.vnodes)
+
+    def close(self):
+        self.db.close()
+
+    def heartbeat(self):
+        """
+        Renew this worker's membership and try to take or keep the leader lease.
+
+        Returns:
+            bool: True if this worker is the leader now.
+        """
+        now = time.time()
+        expires_at = now + self.lease_ttl
+        self.db.execute(
+            "INSERT INTO workers (id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET expires_at = excluded.expires_at",
+            (self.worker_id, expires_at)
+        )
+        self.db.execute("DELETE FROM workers WHERE expires_at < ?", (now,))
+        # Taken when free or expired, renewed only by its holder
+        self.db.execute(
+            "INSERT INTO leases (name, worker_id, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET worker_id = excluded.worker_id, expires_at = excluded.expires_at "
+            "WHERE leases.worker_id = excluded.worker_id OR leases.expires_at < ?",
+            (self.LEADER_LEASE, self.worker_id, expires_at, now)
+        )
+        leader = self.db.execute("SELECT worker_id FROM leases WHERE name = ?", (self.LEADER_LEASE,)).fetchone()
+        was_leader, self.is_leader = self.is_leader, leader is not None and leader[0] == self.worker_id
+        if self.is_leader != was_leader:
+            logger.info(f"Worker {self.worker_id} {'became' if self.is_leader else 'is no longer'} the cron leader")
+        if self.is_leader:
+            self.db.execute("DELETE FROM report_claims WHERE claimed_at < ?", (now - CLAIMS_RETENTION,))
+
+        workers = [row[0] for row in self.db.execute("SELECT id FROM workers ORDER BY id")]
+        if workers != self.ring.nodes:
+            logger.info(f"Cluster workers: {', '.join(workers)}")
+            self.ring = HashRing(workers, self.vnodes)
+        return self.is_leader
+
+    def store(self, namespace):
+        """Dictionary shared by all workers, for state that must follow a project between workers"""
+        return SharedStore(self.db, namespace)
+
+    def owns(self, project_id):
+        return self.ring.owner(project_id) == self.worker_id
+
+    def claim_report(self, project_id, tick):
+        """
+        Returns:
+            bool: True if this worker is the first to claim the project's report for the cron tick.
+        """
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO report_claims (project_id, tick, worker_id, claimed_at) VALUES (?, ?, ?, ?)",
+            (project_id, tick, self.worker_id, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def unclaimed(self, project_ids, tick):
+        """Projects of the cron tick nobody has claimed yet"""
+        claimed = {row[0] for row in self.db.execute("SELECT project_id FROM report_claims WHERE tick = ?", (tick,))}
+        return [project_id for project_id in project_ids if project_id not in claimed]
+
+    def leave(self):
+        """Drop membership and the lease on shutdown, so other workers take over without waiting for the TTL"""
+        self.db.execute("DELETE FROM workers WHERE id = ?", (self.worker_id,))
+        self.db.execute("DELETE FROM leases WHERE worker_id = ?", (self.worker_id,))
+        self.is_leader = False
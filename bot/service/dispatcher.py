@@ -0,0 +1,222 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import time
+
+from telegram.error import RetryAfter
+
+from bot.service import metrics
+from bot.utils.logger_config import logger
+
+# Lower value is delivered first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_REPORT = 1
+
+lanes = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_REPORT: "report"}
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum burst size.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self):
+        """Seconds until a token is available, 0 if one is available now."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        """Take all tokens away so the next token is available in exactly the given number of seconds."""
+        self.tokens = 1 - seconds * self.rate
+        self.updated_at = time.monotonic()
+
+
+class _Call:
+    """Queued Telegram call"""
+
+    def __init__(self, send, future, lane):
+        self.send = send
+        self.future = future
+        self.lane = lane
+        self.queued_at = time.monotonic()
+        self.retries = 0
+
+
+class _ChatQueue:
+    """Calls waiting for one chat, ordered by (priority, sequence)"""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.pending = []
+        # A call to the chat is being sent, calls to one chat go out one at a time and in order
+        self.busy = False
+        # Waiting for the chat's rate limit or a RetryAfter pause, workers serve other chats meanwhile
+        self.parked = False
+
+
+class TelegramDispatcher:
+    """
+    Central outbound queue for every Telegram call made by the bot.
+
+    Calls are throttled by a global and a per-chat token bucket, retried after `RetryAfter`
+    and served by priority, so interactive replies go ahead of scheduled reports.
+
+    Scheduling is per chat: a chat with calls is in the ready queue under the priority of its first call.
+    A chat over its rate limit or paused after `RetryAfter` is parked until it may send again,
+    workers never wait for one chat, so a throttled chat doesn't hold up replies to the others.
+    """
+
+    def __init__(self, config):
+        self.global_bucket = TokenBucket(
+            rate=config.get("telegram_global_rate", 25),
+            capacity=config.get("telegram_global_burst", 25),
+        )
+        self.chat_rate = config.get("telegram_chat_rate", 0.33)
+        self.chat_burst = config.get("telegram_chat_burst", 3)
+        self.max_retries = config.get("telegram_max_retries", 3)
+        self.workers_count = config.get("telegram_send_workers", 4)
+
+        # (priority, sequence, chat_id) of chats with a call that may be sent now, stale entries are skipped
+        self.ready = asyncio.PriorityQueue()
+        self.chats = {}
+        self.workers = []
+        self._wakeups = set()
+        self._sequence = itertools.count()
+
+    async def start(self):
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.workers_count)]
+        logger.info(f"Telegram dispatcher started with {self.workers_count} workers")
+
+    async def stop(self):
+        for wakeup in self._wakeups:
+            wakeup.cancel()
+        self._wakeups.clear()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def submit(self, chat_id, send, priority=PRIORITY_REPORT):
+        """
+        Queue a Telegram call and wait for its result.
+
+        Args:
+            chat_id (int | str): Chat the call is addressed to, used for per-chat limits and ordering.
+            send (Callable[[], Awaitable]): Performs the call, invoked again on every retry.
+            priority (int): PRIORITY_INTERACTIVE or PRIORITY_REPORT.
+
+        Returns:
+            Any: Result of the call.
+        """
+        future = asyncio.get_running_loop().create_future()
+        chat_id = str(chat_id)
+        chat = self.chats.get(chat_id)
+        if chat is None:
+            chat = self.chats[chat_id] = _ChatQueue(TokenBucket(self.chat_rate, self.chat_burst))
+        call = _Call(send, future, lanes.get(priority, str(priority)))
+        heapq.heappush(chat.pending, (priority, next(self._sequence), call))
+        self._schedule(chat_id, chat)
+        return await future
+
+    def _schedule(self, chat_id, chat):
+        """Put the chat in the ready queue if it has a call and isn't sending or parked"""
+        if chat.pending and not chat.busy and not chat.parked:
+            priority, sequence, _ = chat.pending[0]
+            self.ready.put_nowait((priority, sequence, chat_id))
+
+    def _park(self, chat_id, chat, delay):
+        chat.parked = True
+
+        def wake():
+            self._wakeups.discard(handle)
+            chat.parked = False
+            self._schedule(chat_id, chat)
+
+        handle = asyncio.get_running_loop().call_later(delay, wake)
+        self._wakeups.add(handle)
+
+    async def _worker(self):
+        while True:
+            _, _, chat_id = await self.ready.get()
+            chat = self.chats[chat_id]
+            # A chat may be queued more than once, e.g. when a reply arrives while it waits with a report
+            if chat.busy or chat.parked or not chat.pending:
+                continue
+            priority, sequence, call = chat.pending[0]
+            if call.future.cancelled():
+                heapq.heappop(chat.pending)
+                self._schedule(chat_id, chat)
+                continue
+            delay = chat.bucket.delay()
+            if delay > 0:
+                self._park(chat_id, chat, delay)
+                continue
+            delay = self.global_bucket.delay()
+            if delay > 0:
+                # Every chat waits for the global limit, the chat keeps its place in the ready queue
+                self._schedule(chat_id, chat)
+                await asyncio.sleep(delay)
+                continue
+            chat.bucket.take()
+            self.global_bucket.take()
+            heapq.heappop(chat.pending)
+            chat.busy = True
+            try:
+                if await self._deliver(chat_id, chat, call):
+                    heapq.heappush(chat.pending, (priority, sequence, call))
+            finally:
+                chat.busy = False
+                self._schedule(chat_id, chat)
+
+    async def _deliver(self, chat_id, chat, call):
+        """
+        Returns:
+            bool: True if the call must be retried, the chat's bucket is paused until then.
+        """
+        lane = call.lane
+        metrics.telegram_throttle_seconds.observe(time.monotonic() - call.queued_at, lane=lane)
+        try:
+            with metrics.telegram_send_seconds.time(lane=lane):
+                result = await call.send()
+        except RetryAfter as e:
+            metrics.telegram_retry_after.inc(lane=lane)
+            if call.retries == self.max_retries:
+                metrics.telegram_send_errors.inc(lane=lane)
+                if not call.future.done():
+                    call.future.set_exception(e)
+                return False
+            call.retries += 1
+            retry_after = e.retry_after
+            if isinstance(retry_after, datetime.timedelta):
+                retry_after = retry_after.total_seconds()
+            logger.warning(f"Flood limit hit for chat UUID: {chat_id}, retrying in {retry_after}s")
+            chat.bucket.pause(retry_after)
+            return True
+        except Exception as e:
+            metrics.telegram_send_errors.inc(lane=lane)
+            if not call.future.done():
+                call.future.set_exception(e)
+            return False
+        if not call.future.done():
+            call.future.set_result(result)
+        return False
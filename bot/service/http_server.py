@@ -0,0 +1,160 @@
+import asyncio
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from bot.utils.logger_config import logger
+
+MAX_HEADERS = 100
+MAX_BODY_SIZE = 10 * 1024 * 1024
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15
+
+
+@dataclass
+class HttpRequest:
+    method: str
+    path: str
+    query: dict
+    headers: dict  # lower-cased names
+    body: bytes
+
+
+@dataclass
+class HttpResponse:
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "text/plain; charset=utf-8"
+    headers: dict = field(default_factory=dict)
+
+
+class HttpServer:
+    """
+    Minimal asyncio HTTP/1.1 server for the bot's local endpoints (webhooks, probes, metrics).
+
+    Connections are kept alive between requests, handlers are coroutines taking HttpRequest
+    and returning HttpResponse.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self.prefix_routes = []
+        self.server = None
+        # Tasks serving open connections, idle keep-alive ones included
+        self.connections = set()
+
+    def add_route(self, method, path, handler, prefix=False):
+        """Register a handler for an exact path, or for every path starting with it when prefix is True"""
+        if prefix:
+            self.prefix_routes.append((method.upper(), path, handler))
+            self.prefix_routes.sort(key=lambda route: len(route[1]), reverse=True)
+        else:
+            self.routes[(method.upper(), path)] = handler
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        paths = [path for _, path in self.routes] + [f"{path}*" for _, path, _ in self.prefix_routes]
+        logger.info(f"HTTP server listening on {self.host}:{self.port}, routes: {paths}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            # Since Python 3.12 wait_closed() also waits for open connections,
+            # an idle keep-alive client would hold it for KEEP_ALIVE_TIMEOUT
+            for connection in self.connections:
+                connection.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_connection(self, reader, writer):
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), timeout=KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except Exception as e:
+                    logger.error(f"Error reading HTTP request: {e}")
+                    request = HttpResponse(status=HTTPStatus.BAD_REQUEST)
+                if isinstance(request, HttpResponse):
+                    # Malformed request, the rest of the stream can't be trusted
+                    response, keep_alive = request, False
+                else:
+                    response = await self._dispatch(request)
+                    keep_alive = request.headers.get("connection", "").lower() != "close"
+                writer.write(self._serialize(response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by stop(), the connection is closed below
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                return HttpResponse(status=HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        content_length = int(headers.get("content-length", 0))
+        if content_length > MAX_BODY_SIZE:
+            return HttpResponse(status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(content_length) if content_length else b""
+        url = urlsplit(target)
+        return HttpRequest(
+            method=method.upper(),
+            path=url.path,
+            query={key: values[-1] for key, values in parse_qs(url.query).items()},
+            headers=headers,
+            body=body,
+        )
+
+    async def _dispatch(self, request):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            handler = next(
+                (handler for method, path, handler in self.prefix_routes
+                 if method == request.method and request.path.startswith(path)),
+                None
+            )
+        if handler is None:
+            if any(path == request.path for _, path in self.routes) or \
+                    any(request.path.startswith(path) for _, path, _ in self.prefix_routes):
+                return HttpResponse(status=HTTPStatus.METHOD_NOT_ALLOWED)
+            return HttpResponse(status=HTTPStatus.NOT_FOUND)
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"Error handling {request.method} {request.path}: {e}")
+            return HttpResponse(status=HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def _serialize(response, keep_alive):
+        status = HTTPStatus(response.status)
+        headers = {
+            "Content-Type": response.content_type,
+            "Content-Length": str(len(response.body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers,
+        }
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        return (head + "\r\n").encode("latin-1") + response.body
@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+from bot.utils.logger_config import logger
+from bot.utils.utils import load_members_from_file, load_projects_from_file, load_config_from_file
+
+
+def normalize_username(name):
+    # members.json may store Telegram usernames with or without "@", commands are matched case-insensitively
+    return str(name).strip().lstrip("@").lower()
+
+
+class Mappings:
+    """
+    Snapshot of member and project mappings with precomputed indexes in both directions.
+
+    A snapshot is never modified after it's built, a reload builds a new one, so a command holding
+    a snapshot keeps seeing consistent mappings while the registry swaps in fresh ones.
+
+    Args:
+        members (dict): Plane member id -> Telegram username.
+        projects (dict): Plane project id -> Telegram chat id.
+    """
+
+    def __init__(self, members, projects):
+        self.members = {str(member_id).lower(): str(name).strip().lstrip("@") for member_id, name in members.items()}
+        self.member_ids = {normalize_username(name): member_id for member_id, name in self.members.items()}
+        self.projects = {str(project_id).lower(): str(chat_id) for project_id, chat_id in projects.items()}
+        self.chats = {chat_id: project_id for project_id, chat_id in self.projects.items()}
+
+    @classmethod
+    def load(cls, members_file_path, projects_file_path):
+        return cls(load_members_from_file(members_file_path), load_projects_from_file(projects_file_path))
+
+    def find_member_ids(self, names):
+        """
+        Returns:
+            tuple[list, list]: Plane ids of members with these Telegram usernames, and the names not found.
+        """
+        ids, not_found = [], []
+        for name in names:
+            member_id = self.member_ids.get(normalize_username(name))
+            if member_id is None:
+                not_found.append(name)
+            else:
+                ids.append(member_id)
+        return ids, not_found
+
+
+class MappingRegistry:
+    """
+    Holds the current Mappings and reloads them, and the config, when their files change.
+
+    Files are polled by mtime. A reload that fails to read or parse any file keeps the current
+    mappings and config, so a half-saved file never breaks running commands.
+
+    Args:
+        config (dict): Loaded config, updated in place on reload so every holder sees new values.
+        config_path (str | None): config.yaml to watch, None to watch only the mapping files.
+        mappings (Mappings | None): Initial mappings, loaded from the files in config when None.
+    """
+
+    def __init__(self, config, config_path=None, mappings=None):
+        self.config = config
+        self.config_path = config_path
+        self.reload_interval = config.get("mappings_reload_interval", 10)
+        self.current = mappings or Mappings.load(config["members_file_path"], config["projects_file_path"])
+        self.mtimes = self._mtimes(config) if mappings is None else {}
+
+    @classmethod
+    def from_maps(cls, members_map, projects_map, config=None):
+        """Registry over fixed in-memory maps, nothing is watched"""
+        registry = cls(config or {}, mappings=Mappings(members_map, projects_map))
+        registry.reload_interval = 0
+        return registry
+
+    def _paths(self, config):
+        paths = [config["members_file_path"], config["projects_file_path"]]
+        if self.config_path:
+            paths.append(self.config_path)
+        return paths
+
+    def _mtimes(self, config):
+        mtimes = {}
+        for path in self._paths(config):
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def _load(self):
+        config = load_config_from_file(self.config_path) if self.config_path else self.config
+        mappings = Mappings.load(config["members_file_path"], config["projects_file_path"])
+        return config, mappings, self._mtimes(config)
+
+    async def reload_if_changed(self):
+        """Reload mappings and config if any watched file changed since the last load."""
+        mtimes = await asyncio.to_thread(self._mtimes, self.config)
+        if mtimes == self.mtimes:
+            return False
+        try:
+            config, mappings, mtimes = await asyncio.to_thread(self._load)
+        except Exception as e:
+            # Remember the broken version, otherwise the error is logged on every poll
+            self.mtimes = mtimes
+            logger.error(f"Failed to reload mappings, keeping the current ones: {e}")
+            return False
+        # Swapped without awaiting in between, readers see either the old or the new state
+        if config is not self.config:
+            self.config.clear()
+            self.config.update(config)
+        self.current = mappings
+        self.mtimes = mtimes
+        logger.info(f"Reloaded mappings: {len(mappings.members)} members, {len(mappings.projects)} projects")
+        return True
@@ -0,0 +1,162 @@
+import functools
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+
+from bot.service.http_server import HttpResponse
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                state["buckets"][index] += 1
+        state["sum"] += value
+        state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started_at, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, state in self.values.items():
+            for bound, count in zip(self.buckets, state["buckets"]):
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', bound),))} {count}")
+            lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {state['count']}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {state['sum']}")
+            lines.append(f"{self.name}_count{format_labels(key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric of the bot and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def handle_metrics(self, request):
+        return HttpResponse(
+            status=HTTPStatus.OK,
+            body=self.render().encode("utf-8"),
+            content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+registry = MetricsRegistry()
+
+plane_request_seconds = registry.register(Histogram(
+    "plane_request_duration_seconds", "Plane API request latency", ["endpoint", "method"]))
+plane_request_errors = registry.register(Counter(
+    "plane_request_errors_total", "Plane API requests failed or answered with an error status", ["endpoint", "method"]))
+plane_request_retries = registry.register(Counter(
+    "plane_request_retries_total", "Plane API requests retried after a transient error", ["endpoint"]))
+command_seconds = registry.register(Histogram(
+    "telegram_command_duration_seconds", "Telegram command handling latency", ["command"]))
+command_errors = registry.register(Counter(
+    "telegram_command_errors_total", "Telegram commands failed with an unexpected error", ["command"]))
+telegram_send_seconds = registry.register(Histogram(
+    "telegram_send_duration_seconds", "Telegram API call latency, without throttling", ["lane"]))
+telegram_send_errors = registry.register(Counter(
+    "telegram_send_errors_total", "Telegram API calls failed after all retries", ["lane"]))
+telegram_throttle_seconds = registry.register(Histogram(
+    "telegram_throttle_wait_seconds", "Time Telegram calls waited in the queue and for rate limits", ["lane"]))
+telegram_retry_after = registry.register(Counter(
+    "telegram_retry_after_total", "Telegram flood control (RetryAfter) errors", ["lane"]))
+report_project_seconds = registry.register(Histogram(
+    "report_project_duration_seconds", "Scheduled report duration per project", ["project_id"]))
+report_project_errors = registry.register(Counter(
+    "report_project_errors_total", "Scheduled reports failed or timed out per project", ["project_id", "reason"]))
+report_run_seconds = registry.register(Histogram(
+    "report_run_duration_seconds", "Duration of a whole scheduled report run"))
+report_cron_interval = registry.register(Gauge(
+    "report_cron_interval_seconds", "Interval between scheduled report runs"))
+cluster_leader = registry.register(Gauge(
+    "cluster_leader", "1 if this worker holds the cron leader lease"))
+cluster_workers = registry.register(Gauge(
+    "cluster_workers", "Live workers sharing the projects"))
+
+
+def track_command(command):
+    """Decorator for Telegram command handlers, records latency and errors escaping the handler"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            with command_seconds.time(command=command):
+                try:
+                    return await handler(*args, **kwargs)
+                except Exception:
+                    command_errors.inc(command=command)
+                    raise
+        return wrapper
+    return decorator
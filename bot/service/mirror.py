@@ -0,0 +1,197 @@
+import json
+import sqlite3
+import time
+
+from bot.utils.logger_config import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS states (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS states_project ON states (project_id, position);
+CREATE TABLE IF NOT EXISTS issues (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    name TEXT,
+    state TEXT,
+    assignees TEXT NOT NULL,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_project_state ON issues (project_id, state, created_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    last_sync REAL,
+    last_reconcile REAL
+);
+"""
+
+
+class PlaneMirror:
+    """
+    Local SQLite copy of projects, states and issues of the mapped projects.
+
+    Issues are synced incrementally: only issues updated after the last sync watermark are fetched,
+    newest first. A periodic full reconcile catches deleted issues. Read methods mirror the PlaneAPI
+    ones used for reports, so reports keep working while Plane is slow or down.
+
+    Args:
+        plane_api (PlaneAPI): Source of the data.
+        config (dict): Bot config.
+    """
+
+    # Issue fields stored in the mirror
+    ISSUE_FIELDS = ("id", "name", "state", "assignees", "created_at", "updated_at")
+
+    def __init__(self, plane_api, config):
+        self.plane_api = plane_api
+        self.config = config
+        self.reconcile_interval = config.get("mirror_reconcile_interval", 3600)
+        self.db = sqlite3.connect(config.get("mirror_path", "plane_mirror.sqlite3"))
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def is_synced(self, project_id):
+        row = self.db.execute("SELECT last_sync FROM sync_state WHERE project_id = ?", (project_id,)).fetchone()
+        return row is not None and row[0] is not None
+
+    async def sync_all(self, project_ids):
+        for project_id in project_ids:
+            try:
+                await self.sync_project(project_id)
+            except Exception as e:
+                logger.error(f"Failed to sync mirror for project UUID: {project_id}. Error: {e}")
+
+    async def sync_project(self, project_id):
+        started_at = time.time()
+        row = self.db.execute(
+            "SELECT watermark, last_reconcile FROM sync_state WHERE project_id = ?", (project_id,)
+        ).fetchone()
+        watermark, last_reconcile = row if row else (None, None)
+        reconcile = watermark is None or last_reconcile is None or started_at - last_reconcile >= self.reconcile_interval
+
+        project = await self.plane_api.get_project(project_id)
+        states = await self.plane_api.get_task_states_ids(project_id)
+        if not project or not states:
+            logger.warning(f"Mirror sync for project UUID: {project_id} skipped, Plane returned no project or states")
+            return
+
+        params = {"fields": ",".join(self.ISSUE_FIELDS), "order_by": "-updated_at"}
+        if reconcile:
+            # Ids of every issue Plane returns, the ones left out were deleted
+            self.db.execute("CREATE TEMP TABLE IF NOT EXISTS seen_issues (id TEXT PRIMARY KEY)")
+            self.db.execute("DELETE FROM seen_issues")
+            self.db.commit()
+        # Issues are written page by page, only one page is held in memory even during a reconcile
+        page = []
+        fetched = 0
+        new_watermark = watermark or ""
+
+        def write_page():
+            with self.db:
+                for issue in page:
+                    self._upsert_issue(project_id, issue)
+                if reconcile:
+                    self.db.executemany("INSERT OR IGNORE INTO seen_issues (id) VALUES (?)", [(issue["id"],) for issue in page])
+            page.clear()
+
+        async for issue in self.plane_api.iter_project_tasks(project_id, params=params):
+            # Newest first, everything after the watermark is already in the mirror
+            if not reconcile and issue.get("updated_at") and issue["updated_at"] <= watermark:
+                break
+            page.append(issue)
+            fetched += 1
+            if issue.get("updated_at") and issue["updated_at"] > new_watermark:
+                new_watermark = issue["updated_at"]
+            if len(page) >= self.plane_api.issues_page_size:
+                write_page()
+        write_page()
+
+        with self.db:
+            self.db.execute(
+                "INSERT INTO projects (id, data) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                (project_id, json.dumps(project, ensure_ascii=False))
+            )
+            self.db.execute("DELETE FROM states WHERE project_id = ?", (project_id,))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO states (id, project_id, name, position) VALUES (?, ?, ?, ?)",
+                [(state["id"], project_id, state["name"], position) for position, state in enumerate(states["results"])]
+            )
+            if reconcile:
+                # Reached only when the whole project was streamed, a failed fetch deletes nothing
+                self.db.execute(
+                    "DELETE FROM issues WHERE project_id = ? AND id NOT IN (SELECT id FROM seen_issues)", (project_id,)
+                )
+            self.db.execute(
+                "INSERT INTO sync_state (project_id, watermark, last_sync, last_reconcile) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (project_id) DO UPDATE SET watermark = excluded.watermark, last_sync = excluded.last_sync, "
+                "last_reconcile = COALESCE(excluded.last_reconcile, sync_state.last_reconcile)",
+                (project_id, new_watermark or None, started_at, started_at if reconcile else None)
+            )
+        logger.info(f"Mirror synced project UUID: {project_id}, {fetched} issues fetched, reconcile: {reconcile}")
+
+    def _upsert_issue(self, project_id, issue):
+        self.db.execute(
+            "INSERT INTO issues (id, project_id, name, state, assignees, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+            "name = excluded.name, state = excluded.state, assignees = excluded.assignees, "
+            "created_at = COALESCE(excluded.created_at, issues.created_at), updated_at = excluded.updated_at",
+            (
+                issue["id"], project_id, issue.get("name"), issue.get("state"),
+                json.dumps(issue.get("assignees") or []), issue.get("created_at"), issue.get("updated_at")
+            )
+        )
+
+    def upsert_issue(self, project_id, issue):
+        """Write an issue changed by the bot itself, so reports see it before the next sync"""
+        with self.db:
+            self._upsert_issue(project_id, issue)
+
+    def delete_issue(self, issue_id):
+        with self.db:
+            self.db.execute("DELETE FROM issues WHERE id = ?", (issue_id,))
+
+    async def get_project(self, project_id):
+        row = self.db.execute("SELECT data FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def map_states_by_ids(self, project_id):
+        rows = self.db.execute(
+            "SELECT id, name FROM states WHERE project_id = ? ORDER BY position", (project_id,)
+        ).fetchall()
+        return dict(rows)
+
+    async def get_tasks_by_status_for_project(self, project_id):
+        """Same result as PlaneAPI.get_tasks_by_status_for_project, read from the mirror."""
+        states_list = self.config["report_states_list"]
+        project_states_map = await self.map_states_by_ids(project_id)
+        if not project_states_map:
+            logger.warning(f"No statuses found in mirror for project ID: {project_id}")
+            return
+        report_states_map = {state_id: name for state_id, name in project_states_map.items() if name in states_list}
+        if not report_states_map:
+            logger.warning(f"No relevant statuses found for project ID: {project_id}")
+            return
+        placeholders = ", ".join("?" for _ in report_states_map)
+        rows = self.db.execute(
+            f"SELECT id, name, state, assignees, updated_at FROM issues "
+            f"WHERE project_id = ? AND state IN ({placeholders}) ORDER BY created_at DESC",
+            (project_id, *report_states_map.keys())
+        ).fetchall()
+        result = {state_name: [] for state_name in report_states_map.values()}
+        for issue_id, name, state, assignees, updated_at in rows:
+            result[report_states_map[state]].append(
+                {"id": issue_id, "name": name, "state": state, "assignees": json.loads(assignees), "updated_at": updated_at}
+            )
+        return result
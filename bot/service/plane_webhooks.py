@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from http import HTTPStatus
+
+from bot.service.http_server import HttpRequest, HttpResponse
+from bot.utils.cache import TTLCache
+from bot.utils.logger_config import logger
+from bot.utils.markdown import escape_markdown_v2, link
+
+action_titles = {
+    "created": "\U0001F195 Task created",
+    "updated": "\u270F\uFE0F Task updated",
+    "deleted": "\U0001F5D1 Task removed",
+}
+
+
+def normalize_action(action):
+    # Plane sends both "create" and "created" style actions depending on version
+    action = (action or "").lower()
+    for normalized in action_titles:
+        if action and normalized.startswith(action.rstrip("d")):
+            return normalized
+    return "updated"
+
+
+def entity_id(value):
+    # Related entities come either as plain ids or as expanded objects
+    return value.get("id") if isinstance(value, dict) else value
+
+
+class PlaneWebhookNotifier:
+    """
+    Receives Plane issue webhooks and posts them as notifications to the chat mapped to the issue's project.
+
+    Events of one issue are coalesced: the notification is sent once no new event arrived for
+    `plane_webhook_debounce` seconds, but never later than `plane_webhook_max_delay` after the first event.
+
+    Args:
+        plane_api (PlaneAPI): Used for links, states and members names.
+        chat_for_project (Callable[[str], str | None]): Returns the chat id mapped to a project.
+        send (Callable[[str, str], Awaitable]): Sends a MarkdownV2 message to a chat.
+        config (dict): Bot config.
+    """
+
+    def __init__(self, plane_api, chat_for_project, send, config):
+        self.plane_api = plane_api
+        self.chat_for_project = chat_for_project
+        self.send = send
+        self.secret = config.get("plane_webhook_secret")
+        # Unsigned requests could post anything into mapped chats
+        if not self.secret:
+            raise ValueError("plane_webhook_secret is required when plane_webhooks is enabled")
+        self.debounce = config.get("plane_webhook_debounce", 10)
+        self.max_delay = config.get("plane_webhook_max_delay", 60)
+        # issue_id -> coalesced pending notification
+        self.pending = {}
+        self.flush_tasks = set()
+        # Delete events may lack the project, remember where recently seen issues live
+        self.issue_projects = TTLCache(maxsize=10000, ttl=24 * 60 * 60)
+
+    def verify_signature(self, request: HttpRequest):
+        expected = hmac.new(self.secret.encode("utf-8"), request.body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(request.headers.get("x-plane-signature", ""), expected)
+
+    async def handle_webhook(self, request: HttpRequest):
+        if not self.verify_signature(request):
+            logger.warning("Plane webhook request with invalid signature rejected")
+            return HttpResponse(status=HTTPStatus.FORBIDDEN)
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return HttpResponse(status=HTTPStatus.BAD_REQUEST)
+        event = payload.get("event") or request.headers.get("x-plane-event")
+        data = payload.get("data") or {}
+        if event == "state" and data.get("project"):
+            self.plane_api.invalidate_states(entity_id(data.get("project")))
+        elif event == "issue":
+            self.add_event(normalize_action(payload.get("action")), data, payload.get("activity") or {})
+        return HttpResponse(status=HTTPStatus.OK)
+
+    def add_event(self, action, issue, activity):
+        issue_id = issue.get("id")
+        project_id = entity_id(issue.get("project") or issue.get("project_id")) or self.issue_projects.get(issue_id)
+        if issue_id is None or project_id is None:
+            logger.warning(f"Plane webhook event without issue or project id skipped: {action}")
+            return
+        self.issue_projects.set(issue_id, project_id)
+        if self.chat_for_project(project_id) is None:
+            logger.debug(f"Plane webhook for unmapped project {project_id} skipped")
+            return
+
+        now = time.monotonic()
+        pending = self.pending.get(issue_id)
+        if pending is None:
+            pending = {"action": action, "project_id": project_id, "issue": {}, "changes": {}, "first_seen": now}
+            self.pending[issue_id] = pending
+        else:
+            pending["timer"].cancel()
+            if action == "deleted":
+                if pending["action"] == "created":
+                    # Created and removed within one window, nothing to tell
+                    del self.pending[issue_id]
+                    return
+                pending["action"] = "deleted"
+        # Latest known issue fields win, the first old value and the last new value of every field are kept
+        pending["issue"].update({key: value for key, value in issue.items() if value is not None})
+        field = activity.get("field")
+        if field and field not in ("description", "description_html", "sort_order"):
+            old_value = pending["changes"].get(field, (activity.get("old_value"), None))[0]
+            pending["changes"][field] = (old_value, activity.get("new_value"))
+
+        delay = min(self.debounce, max(0.0, pending["first_seen"] + self.max_delay - now))
+        pending["timer"] = asyncio.get_running_loop().call_later(delay, self.schedule_flush, issue_id)
+
+    def schedule_flush(self, issue_id):
+        task = asyncio.ensure_future(self.flush(issue_id))
+        # Keep a reference until the task is done, so it isn't garbage collected mid-flight
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def flush(self, issue_id):
+        pending = self.pending.pop(issue_id, None)
+        if pending is None:
+            return
+        chat_id = self.chat_for_project(pending["project_id"])
+        if chat_id is None:
+            return
+        try:
+            notification = await self.render(issue_id, pending)
+            await self.send(chat_id, notification)
+            logger.info(f"Sent Plane notification for issue {issue_id} to chat UUID: {chat_id}")
+        except Exception as e:
+            logger.error(f"Failed to send Plane notification for issue {issue_id} to chat UUID: {chat_id}. Error: {e}")
+
+    async def render(self, issue_id, pending):
+        md_v2 = escape_markdown_v2
+        issue = pending["issue"]
+        project_id = pending["project_id"]
+        task_link = f"{self.plane_api.base_url}{self.plane_api.workspace_slug}/projects/{project_id}/issues/{issue_id}"
+        name = issue.get("name") or issue_id
+        lines = [md_v2(action_titles[pending["action"]])]
+        if pending["action"] == "deleted":
+            lines.append(f"~{md_v2(name)}~ `{issue_id}`")
+        else:
+            lines.append(f"{link(name, task_link)} `{issue_id}`")
+        for field, (old_value, new_value) in pending["changes"].items():
+            if old_value:
+                lines.append(f"{md_v2(field.capitalize())}: ~{md_v2(str(old_value))}~ ⇒ {md_v2(str(new_value))}")
+            else:
+                lines.append(f"{md_v2(field.capitalize())}: {md_v2(str(new_value))}")
+        if pending["action"] == "created" and "state" not in pending["changes"]:
+            state = issue.get("state") or issue.get("state_id")
+            state_name = state.get("name") if isinstance(state, dict) else \
+                (await self.plane_api.map_states_by_ids(project_id)).get(state)
+            if state_name:
+                lines.append(f"State: {md_v2(state_name)}")
+        if pending["action"] == "created" and "assignees" not in pending["changes"]:
+            assignees = [entity_id(item) for item in issue.get("assignees") or issue.get("assignee_ids") or []]
+            if assignees:
+                names = ", ".join('@' + self.plane_api.member_map.get(user_id, str(user_id)) for user_id in assignees)
+                lines.append(f"Assignees: {md_v2(names)}")
+        return "\n".join(lines)
@@ -0,0 +1,103 @@
+import datetime
+import email.utils
+import random
+import time
+
+from bot.utils.logger_config import logger
+
+
+class PlaneUnavailable(Exception):
+    """Plane calls fail fast because the circuit breaker of its base URL is open"""
+
+    def __init__(self, base_url, retry_in):
+        super().__init__(f"Plane is unavailable, try again in {max(1, round(retry_in))}s")
+        self.base_url = base_url
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one Plane server.
+
+    After `failure_threshold` consecutive failures (connection errors, timeouts, 5xx) the breaker opens and
+    requests fail fast with PlaneUnavailable. Once `reset_timeout` passes, one request is let through
+    as a probe: success closes the breaker, failure keeps it open for another `reset_timeout`.
+
+    Args:
+        base_url (str): Plane server the breaker protects.
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open before a probe.
+    """
+
+    def __init__(self, base_url, failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def before_request(self):
+        """Raises PlaneUnavailable while the breaker is open, lets a probe through after reset_timeout"""
+        if self.opened_at is None:
+            return
+        retry_in = self.opened_at + self.reset_timeout - time.monotonic()
+        if retry_in > 0:
+            raise PlaneUnavailable(self.base_url, retry_in)
+        # This request is the probe, the next one is allowed only after another reset_timeout
+        self.opened_at = time.monotonic()
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Plane at {self.base_url} is available again, circuit breaker closed")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is None and self.failures >= self.failure_threshold:
+            logger.error(f"Plane at {self.base_url} failed {self.failures} times in a row, "
+                         f"circuit breaker opened for {self.reset_timeout}s")
+            self.opened_at = time.monotonic()
+        elif self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+# base_url -> CircuitBreaker, shared by every client of the same Plane server
+_breakers = {}
+
+
+def circuit_breaker(base_url, failure_threshold=5, reset_timeout=30):
+    breaker = _breakers.get(base_url)
+    if breaker is None:
+        breaker = _breakers[base_url] = CircuitBreaker(base_url, failure_threshold, reset_timeout)
+    return breaker
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter, so retries of many callers don't hit Plane at the same moment"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_delay(response):
+    """
+    Returns:
+        float | None: Seconds from the Retry-After header, given as seconds or as an HTTP date, None if absent.
+    """
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
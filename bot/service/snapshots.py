@@ -0,0 +1,68 @@
+from bot.utils.storage import JsonFileStore
+
+
+class ReportSnapshotStore:
+    """
+    Last reported state of every project's tasks, used to skip unchanged reports or send only the changes.
+
+    A snapshot maps task id to its name, status, assignees and updated_at.
+
+    Snapshots saved during a report run are kept in memory and written together by flush() at the end of the run.
+
+    Args:
+        file_path (str | None): JSON file the snapshots are kept in, nothing is persisted when None.
+        store (JsonFileStore | SharedStore | None): Store to use instead of the file, e.g. shared by cluster workers.
+    """
+
+    def __init__(self, file_path=None, store=None):
+        self.store = store if store is not None else JsonFileStore(file_path)
+        # project_id -> snapshot saved since the last flush
+        self.pending = {}
+
+    def get(self, project_id):
+        snapshot = self.pending.get(project_id)
+        return snapshot if snapshot is not None else self.store.get(project_id)
+
+    def save(self, project_id, snapshot):
+        self.pending[project_id] = snapshot
+
+    async def flush(self):
+        """Write the saved snapshots to the store at once"""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        await self.store.update(pending)
+
+    @staticmethod
+    def build_snapshot(categorized_tasks):
+        return {
+            task["id"]: {
+                "name": task.get("name"),
+                "status": status,
+                "assignees": sorted(set(task.get("assignees") or [])),
+                "updated_at": task.get("updated_at"),
+            }
+            for status, tasks in categorized_tasks.items()
+            for task in tasks
+        }
+
+    @staticmethod
+    def diff(previous, snapshot):
+        """
+        Compare two snapshots of one project.
+
+        Returns:
+            dict: Task ids grouped by change: 'added', 'moved', 'updated' (same status, other fields changed)
+            and 'removed' (no longer in reported statuses).
+        """
+        changes = {"added": [], "moved": [], "updated": [], "removed": []}
+        for task_id, task in snapshot.items():
+            old_task = previous.get(task_id)
+            if old_task is None:
+                changes["added"].append(task_id)
+            elif old_task["status"] != task["status"]:
+                changes["moved"].append(task_id)
+            elif old_task != task:
+                changes["updated"].append(task_id)
+        changes["removed"] = [task_id for task_id in previous if task_id not in snapshot]
+        return changes
@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small in-memory cache with per-entry time-to-live and LRU eviction.
+
+    Args:
+        maxsize (int): Maximum number of entries, least recently used ones are evicted first.
+        ttl (float): Entry lifetime in seconds.
+    """
+
+    def __init__(self, maxsize=128, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or the whole cache when key is None."""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls: while a call for a key is in flight, later callers
+    with the same key await its result instead of starting their own. Nothing is kept after it finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        """
+        Args:
+            key (Hashable): Identity of the call.
+            func (Callable[[], Awaitable]): Starts the call, used only when none is in flight for the key.
+
+        Returns:
+            Result of the shared call, its exception is raised to every caller.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # One caller giving up, e.g. on a timeout, doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    def forget(self, key):
+        """Later callers start a new call instead of joining the one in flight, e.g. after the data changed"""
+        self._calls.pop(key, None)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self):
+        return len(self._calls)
+
+
+def single_flight(method):
+    """Decorator of async methods, concurrent calls with equal arguments share one call through `self.inflight`"""
+    @functools.wraps(method)
+    async def wrapper(self, *args):
+        return await self.inflight.do((method.__name__, *args), lambda: method(self, *args))
+    return wrapper
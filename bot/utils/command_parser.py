@@ -0,0 +1,326 @@
+import datetime
+import re
+from dataclasses import dataclass, field
+
+from bot.utils.utils import fail_emoji, index_to_priority
+
+UUID_PATTERN = r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+MAX_TITLE_LENGTH = 255
+
+# Message label -> TaskFields attribute
+labels = {
+    "uuid": "task_id",
+    "title": "title",
+    "description": "description",
+    "start": "start_date",
+    "deadline": "target_date",
+    "priority": "priority",
+    "state": "state",
+}
+label_names = {attribute: label.capitalize() if label != "uuid" else "UUID" for label, attribute in labels.items()}
+
+# A field label or a mention, both only at the start of a word
+_TOKEN = re.compile(
+    r'(?<![^\s,])(?:(?P<label>' + '|'.join(labels) + r')[ \t]*:|@(?P<mention>\w+))',
+    re.IGNORECASE
+)
+_UUID = re.compile(UUID_PATTERN)
+_MENTION = re.compile(r'@\w+')
+# YYYY-MM-DD or DD-MM-YYYY, same formats as normalize_date without the cost of strptime
+_DATE = re.compile(r'(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})|(?P<d>\d{1,2})-(?P<m>\d{1,2})-(?P<y>\d{4})')
+_VALUE_STRIP = " \t\r\n,"
+_SEPARATORS = re.compile(r'[\s,]+')
+
+newtask_format = (
+    "/newtask\n"
+    "Title: <task-title> (max length = 255)\n"
+    "Description: <task-description>\n"
+    "Start: <task-start-date> (YYYY-MM-DD)\n"
+    "Deadline: <task-deadline-date> (YYYY-MM-DD)\n"
+    "Priority: <(lowest)0->1->2->3->4(highest)>\n"
+    "State: <state-name> (check with /getstates)\n"
+    "@assignees_names"
+)
+newtasks_format = (
+    "/newtasks\n"
+    "Title: <first-task-title>\n"
+    "State: <state-name>\n"
+    "@assignees_names\n"
+    "Title: <second-task-title>\n"
+    "Description: <task-description>\n"
+    "...\n"
+    "Every Title starts a new task, other fields are the same as in /newtask"
+)
+movetasks_format = "/movetasks <state-name> <task-uuid> <task-uuid> ..."
+assigntasks_format = "/assigntasks @assignee_name ... <task-uuid> <task-uuid> ..."
+updatetask_format = (
+    "/updatetask\n"
+    "UUID: <task-UUID>\n"
+    "Title: <task-title> (max length = 255)\n"
+    "Description: <task-description>\n"
+    "Start: <task-start-date> (YYYY-MM-DD)\n"
+    "Deadline: <task-deadline-date> (YYYY-MM-DD)\n"
+    "Priority: <(lowest)0->1->2->3->4(highest)>\n"
+    "State: <state-name> (check with /getstates)\n"
+    "@assignees_names"
+)
+
+
+class CommandSyntaxError(ValueError):
+    """Command text can't be parsed, `errors` lists every problem found, one message per field"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass
+class TaskFields:
+    task_id: str | None = None
+    title: str | None = None
+    description: str | None = None
+    start_date: str | None = None  # YYYY-MM-DD
+    target_date: str | None = None  # YYYY-MM-DD
+    priority: str | None = None  # Plane priority name
+    state: str | None = None  # state name, resolved to an id by the caller
+    assignees: list = field(default_factory=list)  # mentioned usernames without "@"
+
+
+def _strip_mentions(value):
+    # Mentions closing a field belong to the assignees, not to the field text
+    value = value.rstrip(_VALUE_STRIP)
+    while value:
+        cut = max(value.rfind(char) for char in _VALUE_STRIP) + 1
+        if _MENTION.fullmatch(value, cut) is None:
+            break
+        value = value[:cut].rstrip(_VALUE_STRIP)
+    return value
+
+
+def _parse_date(value):
+    match = _DATE.fullmatch(value)
+    if match is None:
+        return None
+    year, month, day = match.group("year", "month", "day") if match.group("year") else match.group("y", "m", "d")
+    try:
+        return datetime.date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def _convert(attribute, value, errors):
+    label = label_names[attribute]
+    if attribute == "task_id":
+        if _UUID.fullmatch(value) is None:
+            errors.append(f"{label}: '{value}' is not a task UUID")
+            return None
+        return value.lower()
+    if attribute == "title":
+        if not value:
+            errors.append(f"{label} can't be empty")
+            return None
+        if len(value) > MAX_TITLE_LENGTH:
+            errors.append(f"Max title length is {MAX_TITLE_LENGTH} symbols, your title length is {len(value)}")
+            return None
+        return value
+    if not value:
+        # Empty optional fields, e.g. left from the format template, are ignored
+        return None
+    if attribute in ("start_date", "target_date"):
+        date = _parse_date(value)
+        if date is None:
+            errors.append(f"{label}: '{value}' is not a date, use YYYY-MM-DD")
+        return date
+    if attribute == "priority":
+        priority = index_to_priority.get(value)
+        if priority is None and value.lower() in index_to_priority.values():
+            priority = value.lower()
+        if priority is None:
+            errors.append(f"{label}: '{value}' is invalid, use one from range: (lowest)0->1->2->3->4(highest)")
+        return priority
+    return value
+
+
+def format_syntax_errors(error, command_format):
+    """Reply text for a CommandSyntaxError, every error on its own line followed by the command format"""
+    lines = "\n".join(f"  • {message}" for message in error.errors)
+    return f"{fail_emoji} Invalid format:\n{lines}\nUse:\n{command_format}"
+
+
+class CommandParser:
+    """
+    Parser of the bot's task commands, compiled once per bot because command patterns include the bot name.
+
+    Task commands are tokenized in a single pass over the message: field labels (`Title:`, `State:`, ...)
+    split the text into fields and `@mentions` are collected as assignees.
+
+    Args:
+        bot_name (str): Bot username, commands may be addressed as /command@bot_name.
+    """
+
+    def __init__(self, bot_name):
+        self.bot_name = bot_name
+        self.command_pattern = re.compile(
+            rf'^/(?P<command>\w+)(?:@{re.escape(bot_name)})?(?![\w@])[\s,]*', re.IGNORECASE
+        )
+        self.task_id_pattern = re.compile(rf'(?:UUID[ \t]*:)?[\s,]*(?P<id>{UUID_PATTERN})[\s,]*', re.IGNORECASE)
+
+    def split_command(self, text):
+        """
+        Returns:
+            tuple[str | None, str]: Lower-cased command without "/" or None if text isn't a command to this bot,
+            and the text after the command.
+        """
+        match = self.command_pattern.match(text or "")
+        if match is None:
+            return None, text
+        return match.group("command").lower(), text[match.end():]
+
+    def parse_task_id(self, text):
+        """Parse the single task UUID argument of commands like /removetask, None if the text is anything else"""
+        command, arguments = self.split_command(text)
+        match = self.task_id_pattern.fullmatch(arguments) if command else None
+        return match.group("id").lower() if match else None
+
+    def parse_bulk(self, text):
+        """
+        Parse commands applying one change to many tasks, like `/movetasks In Review <uuid> <uuid>`.
+
+        Args:
+            text (str): Whole message text including the command.
+
+        Returns:
+            tuple[str, list[str]]: Text before the first UUID (state name, mentions) and unique task UUIDs in order.
+
+        Raises:
+            CommandSyntaxError: If anything after the first UUID is not a UUID, or no UUID is given.
+        """
+        command, body = self.split_command(text)
+        if command is None:
+            raise CommandSyntaxError(["Message is not a command"])
+        first = _UUID.search(body)
+        if first is None:
+            raise CommandSyntaxError(["At least one task UUID is required"])
+        task_ids = {}
+        errors = []
+        for token in _SEPARATORS.split(body[first.start():]):
+            if not token:
+                continue
+            if _UUID.fullmatch(token):
+                task_ids[token.lower()] = None
+            else:
+                errors.append(f"'{token[:50]}' is not a task UUID")
+        if errors:
+            raise CommandSyntaxError(errors)
+        return body[:first.start()].strip(_VALUE_STRIP), list(task_ids)
+
+    def parse_task(self, text, required=()):
+        """
+        Parse /newtask or /updatetask message.
+
+        Args:
+            text (str): Whole message text including the command.
+            required (tuple[str]): TaskFields attributes which must be present.
+
+        Returns:
+            TaskFields: Typed, validated fields.
+
+        Raises:
+            CommandSyntaxError: With every problem found in the message.
+        """
+        command, body = self.split_command(text)
+        if command is None:
+            raise CommandSyntaxError(["Message is not a command"])
+        [(fields, errors)] = self._parse_blocks(body, required)
+        if errors:
+            raise CommandSyntaxError(errors)
+        return fields
+
+    def parse_tasks(self, text, required=("title",)):
+        """
+        Parse a message with many task blocks, like /newtasks. Every `Title:` starts a new block.
+
+        Args:
+            text (str): Whole message text including the command.
+            required (tuple[str]): TaskFields attributes which must be present in every block.
+
+        Returns:
+            list[TaskFields]: Typed, validated fields of every block in message order.
+
+        Raises:
+            CommandSyntaxError: With every problem found in the message, prefixed with the task number.
+        """
+        command, body = self.split_command(text)
+        if command is None:
+            raise CommandSyntaxError(["Message is not a command"])
+        blocks = self._parse_blocks(body, required, split_on="title")
+        errors = [
+            f"Task {number}: {message}"
+            for number, (_, block_errors) in enumerate(blocks, start=1)
+            for message in block_errors
+        ]
+        if errors:
+            raise CommandSyntaxError(errors)
+        return [fields for fields, _ in blocks]
+
+    @staticmethod
+    def _parse_blocks(body, required, split_on=None):
+        """
+        Returns:
+            list[tuple[TaskFields, list[str]]]: Fields and errors of every block, a repeated split_on field
+            starts a new block, without it there is always exactly one block.
+        """
+        blocks = [_Block()]
+        attribute, value_start = None, 0
+
+        def close_field(end):
+            block = blocks[-1]
+            if attribute is None:
+                leading = body[:end].strip(_VALUE_STRIP)
+                # A bare UUID right after the command is accepted as the task id
+                if leading and "task_id" in required and _UUID.fullmatch(leading):
+                    block.fields.task_id = leading.lower()
+                elif leading and not leading.startswith("@"):
+                    block.errors.append(f"Unexpected text before the first field: '{leading[:50]}'")
+                return
+            value = body[value_start:end]
+            if "@" in value:
+                value = _strip_mentions(value)
+            value = value.strip(_VALUE_STRIP)
+            setattr(block.fields, attribute, _convert(attribute, value, block.errors))
+
+        for match in _TOKEN.finditer(body):
+            mention = match.group("mention")
+            if mention is not None:
+                blocks[-1].assignees[mention] = None
+                continue
+            close_field(match.start())
+            attribute, value_start = labels[match.group("label").lower()], match.end()
+            if attribute == split_on and attribute in blocks[-1].seen:
+                blocks.append(_Block())
+            block = blocks[-1]
+            if attribute in block.seen:
+                block.errors.append(f"{label_names[attribute]} is given more than once")
+            block.seen.add(attribute)
+        close_field(len(body))
+        return [block.finish(required) for block in blocks]
+
+
+class _Block:
+    """Fields of one task being parsed"""
+
+    def __init__(self):
+        self.fields = TaskFields()
+        self.errors = []
+        self.seen = set()
+        self.assignees = {}
+
+    def finish(self, required):
+        fields, errors = self.fields, self.errors
+        fields.assignees = list(self.assignees)
+        for attribute in required:
+            if getattr(fields, attribute) is None and attribute not in self.seen:
+                errors.append(f"{label_names[attribute]} is required")
+        if fields.start_date and fields.target_date and fields.target_date < fields.start_date:
+            errors.append("Deadline can't be earlier than Start")
+        return fields, errors
@@ -1,19 +1,46 @@
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Longest response body written to debug logs, the rest is cut
+DEBUG_PAYLOAD_LIMIT = 2000
 
 
 def setup_logger(name='project', level=logging.INFO):
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(
+        fmt='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    ))
+    # Records are written to stdout by a background thread, so logging never blocks the event loop
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = QueueHandler(log_queue)
+    # Final formatting is done by the console handler in the listener thread
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler])
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-
-    logger.handlers.clear()
-    logger.addHandler(console_handler)
     return logger
+
+
+def truncate_payload(text, limit=DEBUG_PAYLOAD_LIMIT):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more characters]"
+
+
+def log_response(response):
+    """Write an HTTP response to debug log, the body is only read and formatted when debug is enabled"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            f"{response.request.method} {response.url} -> {response.status_code}: {truncate_payload(response.text)}"
+        )
+
+
 logger = setup_logger(level=logging.INFO)
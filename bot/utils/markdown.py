@@ -0,0 +1,168 @@
+"""
+Telegram MarkdownV2 rendering.
+
+Escaping replaces only the special characters a string actually contains, and HTML task descriptions
+are converted in one pass over their tags instead of a chain of regex substitutions.
+"""
+import html
+import re
+
+SPECIAL_CHARS = '_*[]()~`>#+-=|{}.!'
+
+_HTML_TAG = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)([^>]*)>')
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_HREF = re.compile(r'''href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+_INLINE_TAGS = {
+    "b": "*", "strong": "*",
+    "i": "_", "em": "_",
+    "u": "__", "ins": "__",
+    "s": "~", "strike": "~", "del": "~",
+    "tg-spoiler": "||",
+}
+_BLOCK_TAGS = {"p", "div", "li", "ul", "ol", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "tr"}
+
+
+def _escaper(chars):
+    escapes = {char: '\\' + char for char in chars}
+    special = frozenset(escapes)
+
+    def escape(text: str) -> str:
+        # Backslash goes first, the other replacements add backslashes of their own
+        if '\\' in text:
+            text = text.replace('\\', '\\\\')
+        # Only characters present in the text are replaced, most names have none or one or two
+        for char in special.intersection(text):
+            text = text.replace(char, escapes[char])
+        return text
+    return escape
+
+
+escape_markdown_v2 = _escaper(SPECIAL_CHARS)
+# Inside code, pre and link URLs Telegram only requires "`" or ")" and backslash to be escaped
+escape_code = _escaper('`')
+escape_url = _escaper(')')
+
+
+def link(text: str, url: str) -> str:
+    return f"[{escape_markdown_v2(text)}]({escape_url(url)})"
+
+
+def code(text: str) -> str:
+    return f"`{escape_code(text)}`"
+
+
+def html_to_markdownV2(html_text):
+    """
+    Convert Plane's description HTML to Telegram MarkdownV2 in a single pass.
+
+    Formatting tags become MarkdownV2 entities, nested and unclosed tags included, block tags become
+    line breaks, unknown tags are dropped keeping their content and all text is escaped.
+
+    Args:
+        html_text (str | None): HTML to convert.
+
+    Returns:
+        str: MarkdownV2 text, empty for empty input.
+    """
+    if not html_text:
+        return ""
+    if "<!--" in html_text:
+        html_text = _HTML_COMMENT.sub("", html_text)
+    out = []
+    # Open elements: (tag, closing markup, index of the opening markup in out)
+    stack = []
+    verbatim = False
+    in_link = False
+
+    def markup(text):
+        # "___" is ambiguous between italic and underline, Telegram's documented separator is "\r"
+        if text[0] == "_" and out and out[-1][-1:] == "_":
+            out.append("\r")
+        out.append(text)
+
+    def newline():
+        if out and out[-1][-1:] != "\n":
+            out.append("\n")
+
+    def add_text(text):
+        if "&" in text:
+            text = html.unescape(text)
+        out.append(escape_code(text) if verbatim else escape_markdown_v2(text))
+
+    def close_element(tag, closing, index):
+        nonlocal verbatim, in_link
+        # A link without href has no markup but still ends the link, later links must be kept
+        if tag == "a":
+            in_link = False
+        # Code without markup is nested in another code element, which stays verbatim
+        if (tag == "pre" or tag == "code") and closing:
+            verbatim = False
+        if not closing:
+            return
+        if tag == "pre":
+            out.append(closing)
+        elif len(out) == index + 1:
+            # Empty entity, drop its opening markup instead of sending "**"
+            out.pop()
+            if out and out[-1] == "\r":
+                out.pop()
+        else:
+            markup(closing)
+
+    # split() yields text, then (closing slash, tag, attributes, text) for every tag
+    tokens = iter(_HTML_TAG.split(html_text))
+    text = next(tokens)
+    if text:
+        add_text(text)
+    for closing, tag, attrs, text in zip(tokens, tokens, tokens, tokens):
+        tag = tag.lower()
+        if tag == "br":
+            out.append("\n")
+        elif closing:
+            if tag in _BLOCK_TAGS:
+                newline()
+            elif any(entry[0] == tag for entry in stack):
+                # Closing an outer tag closes everything opened inside it
+                while True:
+                    entry = stack.pop()
+                    close_element(*entry)
+                    if entry[0] == tag:
+                        break
+        elif verbatim:
+            # Telegram doesn't allow entities inside code, nested tags are dropped
+            if tag == "pre" or tag == "code":
+                stack.append((tag, "", len(out)))
+        elif tag in _INLINE_TAGS:
+            marker = _INLINE_TAGS[tag]
+            # The same entity can't be nested in itself, "*a *b* c*" would close early
+            if any(entry[1] == marker for entry in stack):
+                marker = ""
+            stack.append((tag, marker, len(out)))
+            if marker:
+                markup(marker)
+        elif tag in _BLOCK_TAGS:
+            newline()
+            if tag == "li":
+                out.append("• ")
+        elif tag == "code":
+            stack.append((tag, "`", len(out)))
+            out.append("`")
+            verbatim = True
+        elif tag == "pre":
+            newline()
+            stack.append((tag, "\n```", len(out)))
+            out.append("```\n")
+            verbatim = True
+        elif tag == "a" and not in_link:
+            href = _HREF.search(attrs)
+            url = html.unescape(next(filter(None, href.groups()), "")) if href else ""
+            stack.append((tag, f"]({escape_url(url)})" if url else "", len(out)))
+            if url:
+                out.append("[")
+            in_link = True
+        if text:
+            add_text(text)
+    while stack:
+        close_element(*stack.pop())
+    return "".join(out).strip()
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+import threading
+
+from bot.utils.logger_config import logger
+
+
+class JsonFileStore:
+    """
+    Dictionary persisted to a JSON file, every change is written atomically.
+
+    Args:
+        file_path (str | None): Where to keep the data, nothing is persisted when None.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.data = self._load()
+        # Writes from update() run in a thread, one file write at a time
+        self._write_lock = threading.Lock()
+
+    def _load(self):
+        if not self.file_path or not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load {self.file_path}, starting empty. Error: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self._save()
+
+    def pop(self, key, default=None):
+        value = self.data.pop(key, default)
+        self._save()
+        return value
+
+    async def update(self, items):
+        """Set several keys and write the file once, off the event loop"""
+        self.data.update(items)
+        if self.file_path:
+            # Values are replaced and never changed in place, a shallow copy is safe to dump in a thread
+            await asyncio.to_thread(self._write, dict(self.data))
+
+    def _save(self):
+        if self.file_path:
+            self._write(self.data)
+
+    def _write(self, data):
+        tmp_path = f"{self.file_path}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as file:
+                    json.dump(data, file, ensure_ascii=False)
+                os.replace(tmp_path, self.file_path)
+            except OSError as e:
+                logger.error(f"Failed to save {self.file_path}. Error: {e}")
@@ -1,5 +1,4 @@
 import json
-import re
 import datetime
 import yaml
 
@@ -25,10 +24,45 @@ def load_projects_from_file(file_path):
         projects = json.load(file)
     return {project["project_id"]: f"{project['chat_id']}" for project in projects}
 
-def escape_markdown_v2(text: str, chars = r'_*[]()~`>#+-=|{}.!') -> str:
-    for char in chars:
-        text = text.replace(char, '\\' + char)
-    return text
+def telegram_length(text: str) -> int:
+    # Telegram measures message length in UTF-16 code units
+    return len(text.encode('utf-16-le')) // 2
+
+def paginate_report(header: str, sections: list, max_length: int = 4096) -> list[str]:
+    """
+    Split a report into messages no longer than max_length.
+
+    Messages are only cut between tasks, so MarkdownV2 entities and links are never broken.
+    Every message starts with the header, a section cut in the middle repeats its heading.
+
+    Args:
+        header (str): Report header, e.g. project name.
+        sections (list): (heading, entries) pairs, an entry is an already rendered task.
+        max_length (int): Maximum message length.
+
+    Returns:
+        list[str]: Messages in sending order.
+    """
+    pages = []
+    lines = [header]
+    size = telegram_length(header)
+    for heading, entries in sections:
+        for index, entry in enumerate(entries):
+            block = [heading, entry] if index == 0 else [entry]
+            block_size = sum(telegram_length(line) + 1 for line in block)
+            if size + block_size > max_length and len(lines) > 1:
+                pages.append("\n".join(lines))
+                if index > 0:
+                    block = [heading, entry]
+                    block_size += telegram_length(heading) + 1
+                lines = [header]
+                size = telegram_length(header)
+            lines.extend(block)
+            size += block_size
+        lines.append("")
+        size += 1
+    pages.append("\n".join(lines))
+    return pages
 
 def normalize_date(date_str: str | None) -> str | None:
     if date_str is None :
@@ -62,31 +96,6 @@ def validate_dates(start_date, target_date, old_issue=None):
     except ValueError:
         return False
 
-def html_to_markdownV2(html_text):
-    # Заменяем основные теги
-    replacements = [
-        (r'<b>(.*?)</b>', r'*\1*'),
-        (r'<i>(.*?)</i>', r'_\1_'),
-        (r'<u>(.*?)</u>', r'__\1__'),
-        (r'<s>(.*?)</s>', r'~\1~'),
-        (r'<code>(.*?)</code>', r'`\1`'),
-        (r'<pre>(.*?)</pre>', r'```\1```'),
-        (r'<a href="(.*?)">(.*?)</a>', r'[\2](\1)'),
-        (r'<br\s*/?>', '\n'),
-        (r'<span>(.*?)</span>', r'\1'),  # Удаляем <span>, оставляя содержимое
-        (r'<[^>]+>', ''),  # Удаляем все остальные теги
-    ]
-
-    for pattern, replacement in replacements:
-        html_text = re.sub(pattern, replacement, html_text, flags=re.DOTALL)
-
-    # Экранируем специальные символы MarkdownV2
-    special_chars = r'_*[]()~`>#+-=|{}.!'
-    for char in special_chars:
-        html_text = html_text.replace(char, '\\' + char)
-
-    return html_text.strip()
-
 def load_config_from_file(file_path="config.yaml"):
     with open(file_path, 'r') as stream:
         data_loaded = yaml.safe_load(stream)
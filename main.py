@@ -7,10 +7,12 @@ from dotenv import load_dotenv
 
 from bot.service.api import PlaneAPI
 from bot.bot import PlaneNotifierBot
+from bot.service.mappings import MappingRegistry
 from bot.utils.logger_config import logger
-from bot.utils.utils import load_members_from_file, load_projects_from_file, load_config_from_file
+from bot.utils.utils import load_config_from_file
 
-if __name__ == '__main__':
+
+async def main():
     load_dotenv()
     workspace_slug = os.getenv('WORKSPACE_SLUG')
     api_token = os.getenv('API_TOKEN')
@@ -22,17 +24,19 @@ if __name__ == '__main__':
     # Configure logging
     logging.getLogger('urllib3').setLevel(logging.INFO)
     logging.getLogger('urllib3').propagate = True
+    logging.getLogger('httpx').setLevel(logging.WARNING)
     if mode.upper() == "DEBUG":
         logger.setLevel(logging.DEBUG)
         logging.getLogger('urllib3').setLevel(logging.DEBUG)
-        for handler in logger.handlers:
-            handler.setLevel(level=logging.DEBUG)
+        logging.getLogger('httpx').setLevel(logging.DEBUG)
 
-    members_map = load_members_from_file(config["members_file_path"])
-    projects_map = load_projects_from_file(config["projects_file_path"])
-    plane_api = PlaneAPI(api_token, workspace_slug,config, members_map, base_url, mode)
-    bot = PlaneNotifierBot(bot_token, bot_name, plane_api,config, members_map, projects_map)
+    # Plane's httpx client is created inside the event loop that runs the bot
+    mappings = MappingRegistry(config, config_path="config.yaml")
+    plane_api = PlaneAPI(api_token, workspace_slug, config, mappings, base_url, mode)
+    bot = PlaneNotifierBot(bot_token, bot_name, plane_api, config, mappings)
+    # Plane data is warmed up by the bot itself, in the background, after it starts serving
+    await bot.run()
 
-    projects_data = plane_api.get_all_projects()
 
-    asyncio.run(bot.run())
+if __name__ == '__main__':
+    asyncio.run(main())